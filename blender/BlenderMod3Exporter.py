@@ -10,6 +10,7 @@ import bpy
 import math
 import os
 import sys
+import numpy as np
 from mathutils import Matrix, Vector
 from collections import OrderedDict
 
@@ -19,7 +20,9 @@ try:
     from ..mod3.Mod3VertexBuffers import Mod3Vertex
     from ..blender.BlenderSupressor import SupressBlenderOps
     from ..blender.BlenderNormals import denormalize
-    from ..common.crc import CrcJamcrc
+    from ..mod3.Mod3Skeleton import bonesFromRecords
+    from ..mod3.Mod3MeshIR import MeshPartIR
+    from ..common.crc import generalhash
 except:
     sys.path.insert(0, r'..\mod3')
     sys.path.insert(0, r'..\common')
@@ -28,9 +31,9 @@ except:
     from Mod3VertexBuffer import Mod3Vertex
     from ModellingApi import ModellingAPI, debugger
     from BlenderSupressor import SupressBlenderOps
-    from crc import CrcJamcrc
-    
-generalhash =  lambda x:  CrcJamcrc.calc(x.encode())
+    from Mod3Skeleton import bonesFromRecords
+    from Mod3MeshIR import MeshPartIR
+    from crc import generalhash
     
 class MeshClone():
     def __init__(self, mesh):
@@ -123,9 +126,10 @@ class BlenderExporterAPI(ModellingAPI):
         BlenderExporterAPI.recursiveEmptyDeconstruct(255, root, protoskeleton, skeletonMap, options.errorHandler)
         for bone in protoskeleton: bone["bone"]["child"] = skeletonMap[bone["bone"]["child"]] if bone["bone"]["child"] in skeletonMap else 255
         options.executeErrors()
-        return [bone["bone"] for bone in protoskeleton], \
-                [bone["LMatrix"] for bone in protoskeleton], \
-                [bone["AMatrix"] for bone in protoskeleton], \
+        #Absolute matrices are recomputed from the local ones by the skeleton
+        return bonesFromRecords([bone["bone"] for bone in protoskeleton]), \
+                np.array([[list(row) for row in bone["LMatrix"]] for bone in protoskeleton], dtype = np.float64).reshape(-1,4,4), \
+                None, \
                 skeletonMap
         
     @staticmethod
@@ -192,12 +196,11 @@ class BlenderExporterAPI(ModellingAPI):
             #Check Child Constraint
             bone["child"] = BlenderExporterAPI.getTarget(child, errorHandler)
             LMatrix= child.matrix_local.copy()
-            AMatrix= LMatrix.inverted()@(storage[pix]["AMatrix"] if len(storage) and pix != 255  else Matrix.Identity(4))
             bone["x"], bone["y"], bone["z"] = (LMatrix[i][3] for i in range(3))
             bone["parentId"] = pix
             bone["length"]=math.sqrt(bone["x"]**2 +bone["y"]**2+ bone["z"]**2)
             cix = len(storage)
-            storage.append({"bone":bone,"AMatrix":AMatrix,"LMatrix":LMatrix})
+            storage.append({"bone":bone,"LMatrix":LMatrix})
             skeletonMap[child.name] = cix
             BlenderExporterAPI.recursiveEmptyDeconstruct(cix, child, storage, skeletonMap, errorHandler)
        
@@ -230,37 +233,55 @@ class BlenderExporterAPI(ModellingAPI):
             loopNormals, loopTangents = BlenderExporterAPI.loopValues(mesh.data, options.splitNormals, options.errorHandler)
             uvMaps = BlenderExporterAPI.uvValues(mesh.data, options.errorHandler)
             colour = BlenderExporterAPI.colourValues(mesh, options.errorHandler)
-            pymesh = []
-            if len(mesh.data.vertices)>65535:
+            vertexCount = len(mesh.data.vertices)
+            if vertexCount>65535:
                 options.errorHandler.vertexCountOverflow()
-            for vertex in mesh.data.vertices:
-                vert = {}
-                vert["position"] = vertex.co
-                vert["weights"] = BlenderExporterAPI.weightHandling(vertex.groups, skeletonMap, groupName, options.errorHandler)
-                #Normal Handling
-                options.errorHandler.verifyLoadLoop("normal", vert, vertex, loopNormals, mesh)#vert["normal"] = loopNormals[vertex.index]
-                #Tangent Handling
-                options.errorHandler.verifyLoadLoop("tangent", vert, vertex, loopTangents, mesh)#vert["tangent"] = loopTangents[vertex.index]
-                #UV Handling
-                vert["uvs"] = [uvMap[vertex.index] if vertex.index in uvMap else options.errorHandler.missingUV(vertex.index, uvMap) for uvMap in uvMaps]
-                if not len(vert["uvs"]):
-                    options.errorHandler.uvLayersMissing(vert)            
-                if len(vert["uvs"])>4:
-                    options.errorHandler.uvCountExceeded(vert)
-                #Colour Handling if present
-                if colour:
-                    options.errorHandler.verifyLoadLoop("colour", vert, vertex, colour, mesh)
-                pymesh.append(vert)
-            faces = []
-            for face in mesh.data.polygons:
-                if len(face.vertices)>3:
-                    faces += options.polyfaces(face)
-                else:
-                    faces.append({v:vert for v,vert in zip(["v1","v2","v3"],face.vertices)})
+            positions = np.zeros(vertexCount*3, dtype = np.float32)
+            mesh.data.vertices.foreach_get("co", positions)
+            normals = [normal[:3] for normal in BlenderExporterAPI.loopColumn("normal", loopNormals, mesh, options.errorHandler)]
+            tangents = BlenderExporterAPI.loopColumn("tangent", loopTangents, mesh, options.errorHandler)
+            uvs = [BlenderExporterAPI.uvColumn(uvMap, vertexCount, options.errorHandler) for uvMap in uvMaps]
+            if not uvs:
+                holder = {}
+                options.errorHandler.uvLayersMissing(holder)
+                uvs = [np.zeros((vertexCount,2))]
+            if len(uvs)>4:
+                holder = {"uvs":uvs}
+                options.errorHandler.uvCountExceeded(holder)
+                uvs = holder["uvs"]
+            colours = BlenderExporterAPI.loopColumn("colour", colour, mesh, options.errorHandler) if colour else None
+            loopVertices = np.zeros(len(mesh.data.loops), dtype = np.int32)
+            mesh.data.loops.foreach_get("vertex_index", loopVertices)
+            loopStarts = np.zeros(len(mesh.data.polygons), dtype = np.int32)
+            loopTotals = np.zeros(len(mesh.data.polygons), dtype = np.int32)
+            mesh.data.polygons.foreach_get("loop_start", loopStarts)
+            mesh.data.polygons.foreach_get("loop_total", loopTotals)
+            faces = options.polyfaces(loopStarts, loopTotals, loopVertices)
             if len(faces)>4294967295:
                 options.errorHandler.faceCountOverflow()
             meshProp["materialIdx"] = options.updateMaterials(meshProp,materials)
-        return {"mesh":pymesh, "faces":faces, "properties":meshProp, "meshname":mesh.name}
+            meshpart = MeshPartIR(positions, faces, normals = normals, tangents = tangents, uvs = uvs,
+                                  colours = colours, properties = meshProp, name = mesh.name)
+            meshpart.bufferedWeights = [BlenderExporterAPI.weightHandling(vertex.groups, skeletonMap, groupName, options.errorHandler)
+                                        for vertex in mesh.data.vertices]
+        return meshpart
+    
+    @staticmethod
+    def loopColumn(field, loopArray, mesh, errorHandler):
+        #Per vertex values of a loop field, vertices without loops take the error handler default
+        column = []
+        for vertex in mesh.data.vertices:
+            if vertex.index in loopArray:
+                column.append(loopArray[vertex.index])
+            else:
+                holder = {}
+                errorHandler.verifyLoadLoop(field, holder, vertex, loopArray, mesh)
+                column.append(holder[field])
+        return column
+    
+    @staticmethod
+    def uvColumn(uvMap, vertexCount, errorHandler):
+        return np.array([uvMap[vix] if vix in uvMap else errorHandler.missingUV(vix, uvMap) for vix in range(vertexCount)], dtype = np.float64).reshape(-1,2)
     
     @staticmethod
     def invertBlockLabel(blockLabel, errorHandler):
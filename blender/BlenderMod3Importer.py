@@ -10,47 +10,43 @@ import bpy
 import bmesh
 import array
 import os
+import numpy as np
 from mathutils import Vector, Matrix
 from collections import OrderedDict
 try:
     from ..mod3.ModellingApi import ModellingAPI, debugger
     from ..blender import BlenderSupressor
-    from ..blender.BlenderNormals import normalize
+    from ..mrl3.DDSDecoder import DDSTexture
+    from ..mrl3.MHWTex import MHWTexture
+    from ..mrl3.TextureConverter import textureCache
 except:
     import sys
     sys.path.insert(0, r'..\mod3')
+    sys.path.insert(0, r'..\mrl3')
     from ModellingApi import ModellingAPI, debugger
+    from DDSDecoder import DDSTexture
+    from MHWTex import MHWTexture
+    from TextureConverter import textureCache
     
 def processPath(path):
     return os.path.splitext(os.path.basename(path))[0]
 
 class BoneGraph():
     def __init__(self, armature):
-        self.bones = {}
-        self.boneParentage = {}
-        for ix, bone in enumerate(armature):
-            bonePoint = BonePoint("Bone.%03d"%ix, bone)
-            self.bones[ix] = bonePoint 
-            if bone["parentId"] in self.bones:
-                self.bones[bone["parentId"]].children.append(bonePoint)
-            else:
-                if bone["parentId"] not in self.boneParentage:
-                    self.boneParentage[bone["parentId"]]=[]
-                self.boneParentage[bone["parentId"]].append(bonePoint)
-        for parentId in self.boneParentage:
-            if parentId != 255:
-                self.bones[parentId].children += self.boneParentage[parentId]
-        self.roots = self.boneParentage[255]
+        self.bones = [BonePoint("Bone.%03d"%ix, ix, armature) for ix in range(len(armature))]
+        for bonePoint in self.bones:
+            bonePoint.children = [self.bones[child] for child in armature.hierarchy.children(bonePoint.index)]
+        self.roots = [self.bones[root] for root in armature.hierarchy.roots()]
         
     def root(self):
         return self.roots
     
 class BonePoint():
-    def __init__(self, name, bone):
-        self.properties = bone["CustomProperties"]
+    def __init__(self, name, index, armature):
+        self.properties = armature.customProperties(index)
         self.name = name
-        self.lmatrix = BlenderImporterAPI.deserializeMatrix("LMatCol",bone)
-        self.pos = Vector((bone["x"],bone["y"],bone["z"]))
+        self.index = index
+        self.lmatrix = Matrix(armature.lmatrices[index].tolist())
         self.children = []
     def children(self):
         return self.children
@@ -75,12 +71,12 @@ class BlenderImporterAPI(ModellingAPI):
     def createEmptyTree(armature, context):
         miniscene = OrderedDict()
         BlenderImporterAPI.createRootNub(miniscene)
-        for ix, bone in enumerate(armature):
-            if "Bone.%03d"%ix not in miniscene:
-                BlenderImporterAPI.createNub(ix, bone, armature, miniscene)
+        for ix in armature.hierarchy.order:
+            BlenderImporterAPI.createNub(ix, armature, miniscene)
         miniscene["Bone.%03d"%255].name = '%s Armature'%processPath(context.path)
         BlenderImporterAPI.linkChildren(miniscene)
         context.armature = miniscene
+        context.boneFunctions = armature.functions
         return   
     
     @staticmethod
@@ -109,6 +105,7 @@ class BlenderImporterAPI(ModellingAPI):
         bpy.ops.object.editmode_toggle()
         BlenderImporterAPI.dbg.write("Loaded Armature\n")
         context.armature = arm_ob
+        context.boneFunctions = armature.functions
         return
     
     @staticmethod
@@ -123,24 +120,27 @@ class BlenderImporterAPI(ModellingAPI):
             #Geometry
             BlenderImporterAPI.dbg.write("\tLoading Geometry\n")
             blenderMesh, blenderObject = BlenderImporterAPI.createMesh("%s %03d"%(filename,ix),meshpart)
-            BlenderImporterAPI.parseProperties(meshpart["properties"], blenderMesh.__setitem__)
-            BlenderImporterAPI.dbg.write("\tBasic Face Count %d\n"%len(meshpart["faces"]))
+            BlenderImporterAPI.parseProperties(meshpart.properties, blenderMesh.__setitem__)
+            BlenderImporterAPI.dbg.write("\tBasic Face Count %d\n"%meshpart.faceCount())
             #Weight Handling
             BlenderImporterAPI.dbg.write("\tLoading Weights\n")
             BlenderImporterAPI.writeWeights(blenderObject, meshpart)
             #Normals Handling
             BlenderImporterAPI.dbg.write("\tLoading Normals\n")
-            BlenderImporterAPI.setNormals(meshpart["normals"],blenderMesh)
+            BlenderImporterAPI.setNormals(meshpart.normals,blenderMesh)
             #Colour
             #Needs to enter object mode
-            if meshpart["colour"]:
+            if meshpart.colours is not None and meshpart.vertexCount():
                 BlenderImporterAPI.dbg.write("\tLoading Colours\n")
+                colours = (meshpart.colours/255.0).tolist()
                 vcol_layer = blenderMesh.vertex_colors.new()
                 for l,col in zip(blenderMesh.loops, vcol_layer.data):
-                    col.color = BlenderImporterAPI.mod3ToBlenderColour(meshpart["colour"][l.vertex_index])
+                    col.color = colours[l.vertex_index]
             #UVs
             BlenderImporterAPI.dbg.write("\tLoading UVs\n")
-            for ix, uv_layer in enumerate(meshpart["uvs"]):
+            for ix, uv_layer in enumerate(meshpart.uvs):
+                #File uvs grow downwards
+                uv_layer = list(zip(uv_layer[:,0].tolist(), (1-uv_layer[:,1]).tolist()))
                 uvLayer = BlenderImporterAPI.createTextureLayer("UV%d"%ix, blenderMesh, uv_layer)#BlenderImporterAPI.uvFaceCombination(uv_layer, meshpart["faces"]))
                 uvLayer.active = ix == 0
                 BlenderImporterAPI.dbg.write("\tLayer Activated\n")
@@ -222,7 +222,7 @@ class BlenderImporterAPI(ModellingAPI):
                 BlenderImporterAPI.assignTexture(meshObject, textureData)
                 BlenderImporterAPI.dbg.write("\tAssigned Texture to Model\n")
             except Exception as e:
-                pass
+                BlenderImporterAPI.dbg.write("\tFailed to Import Texture: %s\n"%str(e))
             
     @staticmethod       
     def overrideMeshDefaults(context):
@@ -264,14 +264,20 @@ class BlenderImporterAPI(ModellingAPI):
     @staticmethod
     def createMesh(name, meshpart):
         BlenderImporterAPI.dbg.write("Geometry Construction\n")
-        blenderMesh = bpy.data.meshes.new("%s LOD %d"%(name,meshpart["properties"]["lod"]))
-        BlenderImporterAPI.dbg.write("Geometry From Pydata\n")
-        BlenderImporterAPI.dbg.write("Vertex Count: %d\n"%len(meshpart['vertices']))
-        BlenderImporterAPI.dbg.write("Faces %d %d\n"%(min(map(lambda x: min(x,default=0),meshpart["faces"]),default=0), max(map(lambda x: max(x,default=0),meshpart["faces"]),default=0)))
-        blenderMesh.from_pydata(meshpart["vertices"],[],meshpart["faces"])
-        BlenderImporterAPI.dbg.write("Pydata Loaded\n")
-        blenderMesh.update()
-        blenderObject = bpy.data.objects.new("%s LOD %d"%(name,meshpart["properties"]["lod"]), blenderMesh)
+        blenderMesh = bpy.data.meshes.new("%s LOD %d"%(name,meshpart.properties["lod"]))
+        BlenderImporterAPI.dbg.write("Geometry From Arrays\n")
+        BlenderImporterAPI.dbg.write("Vertex Count: %d\n"%meshpart.vertexCount())
+        #Sized once and filled from flat buffers, loop_total follows from loop_start since 4.0
+        faceCount = meshpart.faceCount()
+        blenderMesh.vertices.add(meshpart.vertexCount())
+        blenderMesh.vertices.foreach_set("co", meshpart.positions.astype(np.float32).ravel())
+        blenderMesh.loops.add(faceCount*3)
+        blenderMesh.loops.foreach_set("vertex_index", meshpart.faces.astype(np.int32).ravel())
+        blenderMesh.polygons.add(faceCount)
+        blenderMesh.polygons.foreach_set("loop_start", np.arange(0, faceCount*3, 3, dtype = np.int32))
+        BlenderImporterAPI.dbg.write("Arrays Loaded\n")
+        blenderMesh.update(calc_edges = True)
+        blenderObject = bpy.data.objects.new("%s LOD %d"%(name,meshpart.properties["lod"]), blenderMesh)
         BlenderImporterAPI.dbg.write("Geometry Link\n")
         bpy.context.collection.objects.link(blenderObject)
         return blenderMesh, blenderObject
@@ -287,7 +293,9 @@ class BlenderImporterAPI(ModellingAPI):
         meshpart.polygons.foreach_set("use_smooth", [True] * len(meshpart.polygons))
         
         #meshpart.normals_split_custom_set(tuple(zip(*(iter(clnors),) * 3)))
-        meshpart.normals_split_custom_set_from_vertices([normalize(v) for v in normals])
+        normals = np.asarray(normals, dtype = np.float64)
+        lengths = np.linalg.norm(normals, axis = 1)[:,None]
+        meshpart.normals_split_custom_set_from_vertices(np.divide(normals, lengths, out = np.zeros_like(normals), where = lengths > 0).tolist())
         #meshpart.normals_split_custom_set([normals[loop.vertex_index] for loop in meshpart.loops])
         
         # IMPORTANT: In Blender 4.1+, use_auto_smooth has been removed
@@ -310,7 +318,8 @@ class BlenderImporterAPI(ModellingAPI):
         
     @staticmethod
     def mod3ToBlenderColour(mod3Colour):
-        return (mod3Colour.Red/255.0,mod3Colour.Green/255.0,mod3Colour.Blue/255.0,mod3Colour.Alpha/255.0)
+        red, green, blue, alpha = mod3Colour
+        return (red/255.0,green/255.0,blue/255.0,alpha/255.0)
     
     @staticmethod
     def setWorldMeshDefault(mesh):
@@ -337,21 +346,18 @@ class BlenderImporterAPI(ModellingAPI):
         
     
     @staticmethod
-    def createNub(ix, bone, armature, miniscene):
+    def createNub(ix, armature, miniscene):
+        #Bones are created in hierarchy order so the parent nub already exists
         o = bpy.data.objects.new("Bone.%03d"%ix, None )
         miniscene["Bone.%03d"%ix]=o
         bpy.context.collection.objects.link( o )
-        #if bone["parentId"]!=255:
-        parentName = "Bone.%03d"%bone["parentId"]
-        if parentName not in miniscene:
-            BlenderImporterAPI.createNub(bone["parentId"],armature[bone["parentId"]],miniscene)
-        o.parent = miniscene[parentName]
+        o.parent = miniscene["Bone.%03d"%armature.bones["parentId"][ix]]
         
-        o.matrix_local = BlenderImporterAPI.deserializeMatrix("LMatCol",bone)
+        o.matrix_local = Matrix(armature.lmatrices[ix].tolist())
         o.show_wire = True
         o.show_in_front = True
         o.show_bounds = True
-        BlenderImporterAPI.parseProperties(bone["CustomProperties"],o.__setitem__)
+        BlenderImporterAPI.parseProperties(armature.customProperties(ix),o.__setitem__)
     
     class DummyBone():
         def __init__(self):
@@ -383,19 +389,18 @@ class BlenderImporterAPI(ModellingAPI):
         return bone
     
     @staticmethod
-    def deserializeMatrix(baseString, properties):
-        matrix = Matrix(list(map(list,zip(*[properties[baseString+"%d"%column] for column in range(4)]))))
-        return matrix
-    
-    @staticmethod
-    def writeWeights(blenderObject, mod3Mesh):
-        for groupIx,group in mod3Mesh["weightGroups"].items():
+    def writeWeights(blenderObject, meshpart):
+        for groupIx,(vertices, weights) in meshpart.weightGroups.items():
             groupId = "%03d"%groupIx if isinstance(groupIx, int) else str(groupIx) 
             groupName = "Bone.%s"%str(groupId)
-            for vertex,weight in group:
-                if groupName not in blenderObject.vertex_groups:
-                    blenderObject.vertex_groups.new(name = groupName)#blenderObject Maybe?
-                blenderObject.vertex_groups[groupName].add([vertex], weight, 'ADD')
+            if len(vertices) and groupName not in blenderObject.vertex_groups:
+                blenderObject.vertex_groups.new(name = groupName)#blenderObject Maybe?
+            #One add call per distinct weight of the group, vertices are bucketed in a single sort
+            values, inverse = np.unique(weights, return_inverse = True)
+            inverse = inverse.ravel()
+            buckets = np.split(vertices[np.argsort(inverse, kind = 'stable')], np.cumsum(np.bincount(inverse, minlength = len(values)))[:-1])
+            for weight, bucket in zip(values.tolist(), buckets):
+                blenderObject.vertex_groups[groupName].add(bucket.tolist(), weight, 'ADD')
             bpy.ops.object.select_pattern(pattern=blenderObject.name, case_sensitive=False, extend=True)
         return
     
@@ -418,12 +423,37 @@ class BlenderImporterAPI(ModellingAPI):
              
     @staticmethod
     def fetchTexture(filepath):
-        filepath = filepath+".png"
         BlenderImporterAPI.dbg.write("\t%s\n"%filepath)
-        if os.path.exists(filepath):
-            return bpy.data.images.load(filepath)
-        else:
+        if not os.path.exists(filepath):
             raise FileNotFoundError("File %s not found"%filepath)
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension in (".dds", ".tex"):
+            try:
+                return BlenderImporterAPI.imageFromPixels(processPath(filepath), BlenderImporterAPI.decodeTexture(filepath, extension))
+            except ValueError as e:
+                #Formats without an in process decoder (BC6H) go through the external converter
+                BlenderImporterAPI.dbg.write("\tIn Process Decoding Failed: %s\n"%str(e))
+            converted = textureCache.convert(filepath)
+            if converted is None:
+                raise ValueError("Unable to decode or convert %s"%filepath)
+            filepath = converted+".png"
+        return bpy.data.images.load(filepath)
+    
+    @staticmethod
+    def decodeTexture(filepath, extension):
+        if extension == ".dds":
+            return DDSTexture.fromPath(filepath).decode(dtype = np.float32)
+        with MHWTexture.fromPath(filepath) as texture:
+            return texture.decode(dtype = np.float32)
+    
+    @staticmethod
+    def imageFromPixels(name, pixels):
+        #pixels are top-down (height,width,4) floats, blender images start at the bottom row
+        height, width = pixels.shape[:2]
+        image = bpy.data.images.new(name, width, height, alpha = True)
+        image.pixels.foreach_set(np.ascontiguousarray(pixels[::-1]).ravel())
+        image.pack()
+        return image
     
     @staticmethod
     def assignTexture(meshObject, textureData):
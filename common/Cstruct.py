@@ -5,58 +5,38 @@ Created on Mon Jan 28 13:38:38 2019
 @author: AsteriskAmpersand
 """
 import struct
+import numpy as np
 from collections import OrderedDict
-from binascii import hexlify
 
 def chunks(l, n):
     """Yield successive n-sized chunks from l."""
     for i in range(0, len(l), n):
         yield l[i:i + n]
 
+def decodeHalf(buffer):
+    """Decodes IEEE half floats from a buffer or uint16 array into a float64 array."""
+    if isinstance(buffer, np.ndarray):
+        return buffer.view('<f2').astype(np.float64)
+    return np.frombuffer(buffer, dtype = '<f2').astype(np.float64)
+
+def encodeHalf(array):
+    """Encodes floats as IEEE half floats (round to nearest even), returns the uint16 patterns."""
+    with np.errstate(over = 'ignore'):
+        return np.asarray(array, dtype = np.float64).astype('<f2').view('<u2')
+
+halfTable = decodeHalf(np.arange(0x10000, dtype = '<u2')).tolist()
+
 def HalfToFloat(h):
-    s = int((h >> 15) & 0x00000001)    # sign
-    e = int((h >> 10) & 0x0000001f)    # exponent
-    f = int(h & 0x000003ff)            # fraction
-    if s==0 and e==0 and f==0:
-        return 0
-    return (-1)**s*2**(e-15)*(f/(2**10)+1)
+    return halfTable[h & 0xFFFF]
 
 def minifloatDeserialize(x):
-    v = struct.unpack('H', x)
-    return HalfToFloat(v[0])
-#   x = HalfToFloat(v[0])
-#    # hack to coerce int to float
-#    bstring = struct.pack('I',x)
-#    f=struct.unpack('f', bstring)
-#    return f[0]
+    return struct.unpack('e', x)[0]
 
 def minifloatSerialize(x):
-    F16_EXPONENT_BITS = 0x1F
-    F16_EXPONENT_SHIFT = 10
-    F16_EXPONENT_BIAS = 15
-    F16_MANTISSA_BITS = 0x3ff
-    F16_MANTISSA_SHIFT =  (23 - F16_EXPONENT_SHIFT)
-    F16_MAX_EXPONENT =  (F16_EXPONENT_BITS << F16_EXPONENT_SHIFT)
-    a = struct.pack('>f',x)
-    b = hexlify(a)
-    f32 = int(b,16)
-    f16 = 0
-    sign = (f32 >> 16) & 0x8000
-    exponent = ((f32 >> 23) & 0xff) - 127
-    mantissa = f32 & 0x007fffff
-    if exponent == 128:
-    	f16 = sign | F16_MAX_EXPONENT
-    	if mantissa:
-    		f16 |= (mantissa & F16_MANTISSA_BITS)
-    elif exponent > 15:#hack
-    	f16 = sign | F16_MAX_EXPONENT
-    elif exponent >= -15:#hack
-    	exponent += F16_EXPONENT_BIAS
-    	mantissa >>= F16_MANTISSA_SHIFT
-    	f16 = (sign | exponent << F16_EXPONENT_SHIFT | mantissa)
-    else:
-    	f16 = sign
-    return struct.pack('H',f16)
+    try:
+        return struct.pack('e',x)
+    except OverflowError:
+        return struct.pack('H',0xFC00 if x < 0 else 0x7C00)
     
 
 class PyCStruct():
@@ -106,8 +86,77 @@ class PyCStruct():
             if self.__getattribute__(attr) is None:
                 raise AssertionError("Attribute %s is not initialized."%attr)
 
+class CompiledLayout():
+    """Single struct.Struct covering every field of a fixed layout."""
+    SCALAR, ARRAY, STRING = range(3)
+    
+    def __init__(self, fields):
+        formatString = '<'
+        self.slots = []
+        start = 0
+        for name, typeStr in fields.items():
+            if '[' in typeStr:
+                base = typeStr[:typeStr.index('[')]
+                count = int(typeStr[typeStr.index('[')+1:typeStr.index(']')])
+                if base == "char":
+                    formatString += "%ds"%count
+                    self.slots.append((name, CompiledLayout.STRING, start, count))
+                    start += 1
+                else:
+                    formatString += "%d%s"%(count, Cstruct.CTypes[base]['format'])
+                    self.slots.append((name, CompiledLayout.ARRAY, start, count))
+                    start += count
+            else:
+                formatString += Cstruct.CTypes[typeStr]['format']
+                self.slots.append((name, CompiledLayout.SCALAR, start, 1))
+                start += 1
+        self.struct = struct.Struct(formatString)
+        self.size = self.struct.size
+        
+    @staticmethod
+    def compilable(fields):
+        for typeStr in fields.values():
+            base = typeStr[:typeStr.index('[')] if '[' in typeStr else typeStr
+            if base not in Cstruct.CTypes or 'format' not in Cstruct.CTypes[base]:
+                return False
+        return True
+        
+    def distribute(self, values):
+        result = {}
+        for name, kind, start, count in self.slots:
+            if kind == CompiledLayout.SCALAR:
+                result[name] = values[start]
+            elif kind == CompiledLayout.ARRAY:
+                result[name] = list(values[start:start+count])
+            else:
+                result[name] = values[start].decode("ascii")
+        return result
+    
+    def flatten(self, data):
+        values = []
+        for name, kind, start, count in self.slots:
+            if kind == CompiledLayout.SCALAR:
+                values.append(data[name])
+            elif kind == CompiledLayout.ARRAY:
+                values.extend(data[name])
+            else:
+                values.append(data[name].encode("ascii"))
+        return values
+    
+    def unpack(self, data):
+        return self.distribute(self.struct.unpack(data))
+    
+    def unpackFrom(self, buffer, offset = 0):
+        return self.distribute(self.struct.unpack_from(buffer, offset))
+    
+    def pack(self, data):
+        return self.struct.pack(*self.flatten(data))
+    
+    def packInto(self, buffer, offset, data):
+        self.struct.pack_into(buffer, offset, *self.flatten(data))
+
 class Cstruct():
-    deserializer = lambda y: {'deserializer':lambda x: struct.unpack(y,x)[0], 'serializer': lambda x: struct.pack(y,x)}
+    deserializer = lambda y: {'format':y, 'deserializer':lambda x: struct.unpack(y,x)[0], 'serializer': lambda x: struct.pack(y,x)}
     CTypes = {"byte":       {'size':1,**deserializer('b')},
                 "int8":     {'size':1,**deserializer('b')},
                 "ubyte":    {'size':1,**deserializer('B')},
@@ -133,6 +182,8 @@ class Cstruct():
                 "bool":     {'size':1,**deserializer('b')},
             }
     StructTypes = {}
+    #Layout key -> (field operators, CompiledLayout or None), shared by every instance
+    layoutCache = {}
     
     @staticmethod
     def isArrayType(typeStr):
@@ -157,25 +208,59 @@ class Cstruct():
                 }
                 
     def __init__(self, fields):
-       self.struct = OrderedDict()
        self.initialized = True
+       key = tuple(fields.items())
+       if key not in Cstruct.layoutCache:
+           Cstruct.layoutCache[key] = Cstruct.compile(fields)
+       self.struct, self.layout = Cstruct.layoutCache[key]
+    
+    @staticmethod
+    def compile(fields):
+       operators = OrderedDict()
        for name in fields:
             if fields[name] in Cstruct.CTypes:
-                self.struct[name]=Cstruct.CTypes[fields[name]]
+                operators[name]=Cstruct.CTypes[fields[name]]
             elif Cstruct.isArrayType(fields[name]):
-                self.struct[name]=Cstruct.arrayType(fields[name])
+                operators[name]=Cstruct.arrayType(fields[name])
             else:
                 raise ValueError("%s Type is not C Struct class compatible."%fields[name])
+       layout = CompiledLayout(fields) if CompiledLayout.compilable(fields) else None
+       return operators, layout
             
     def __len__(self):
+        if self.layout:
+            return self.layout.size
         return sum([self.struct[element]['size'] for element in self.struct])
         
     def marshall(self, data):
+        if self.layout:
+            if hasattr(data, "unpackFrom"):
+                return self.layout.distribute(data.unpackFrom(self.layout.struct))
+            return self.layout.unpack(data.read(self.layout.size))
         return {varName:typeOperator['deserializer'](data.read(typeOperator['size'])) for varName, typeOperator in self.struct.items()}
     
     def serialize(self, data):
+        if self.layout:
+            return self.layout.pack(data)
         return b''.join([typeOperator['serializer'](data[varName]) for varName, typeOperator in self.struct.items()])
     
+    def unpackFrom(self, buffer, offset = 0):
+        if self.layout:
+            return self.layout.unpackFrom(buffer, offset)
+        data = memoryview(buffer)[offset:offset+len(self)]
+        return {varName:typeOperator['deserializer'](data[start:start+typeOperator['size']].tobytes()) 
+                for (varName, typeOperator), start in zip(self.struct.items(), self.offsets())}
+    
+    def packInto(self, buffer, offset, data):
+        serialization = self.serialize(data)
+        buffer[offset:offset+len(serialization)] = serialization
+        
+    def offsets(self):
+        current = 0
+        for typeOperator in self.struct.values():
+            yield current
+            current += typeOperator['size']
+    
 class Mod3Container():
     def __init__(self, Mod3Class, containeeCount = 0):
         self.mod3Array = [Mod3Class() for _ in range(containeeCount)]
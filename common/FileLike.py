@@ -4,8 +4,11 @@ Created on Sat Feb  9 00:55:14 2019
 
 @author: AsteriskAmpersand
 """
+import mmap
 
 class FileLike():
+    closed = False
+    
     def __init__(self, dataArray):
         self.i = 0
         self.data = dataArray
@@ -35,4 +38,51 @@ class FileLike():
         return self.i
     
     def __len__(self):
-        return len(self.data)
\ No newline at end of file
+        return len(self.data)
+
+class MappedFileLike(FileLike):
+    """FileLike over a memoryview, reads return zero-copy slices of the buffer.
+    
+    Wraps bytes, bytearrays or an mmap of the file on disk (see fromPath).
+    """
+    def __init__(self, buffer, mapping = None, fileHandle = None):
+        super().__init__(memoryview(buffer))
+        self.mapping = mapping
+        self.fileHandle = fileHandle
+        
+    @classmethod
+    def fromPath(cls, path):
+        fileHandle = open(path, 'rb')
+        try:
+            mapping = mmap.mmap(fileHandle.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            #Empty files cannot be mapped
+            buffer = fileHandle.read()
+            fileHandle.close()
+            return cls(buffer)
+        return cls(mapping, mapping, fileHandle)
+        
+    def unpackFrom(self, structure):
+        if self.i+structure.size > len(self.data):
+            raise IndexError("Reading out of Bounds at %d for %d"%(self.i,structure.size))
+        values = structure.unpack_from(self.data, self.i)
+        self.i += structure.size
+        return values
+    
+    def close(self):
+        self.closed = True
+        self.data.release()
+        if self.mapping is not None:
+            try:
+                self.mapping.close()
+            except BufferError:
+                #Views handed out are still alive, the mapping closes once they are collected
+                pass
+            self.fileHandle.close()
+            
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
@@ -25,6 +25,11 @@ Created on Tue Mar 12 01:10:56 2019
 
 """
 import math
+from functools import lru_cache
+try:
+    import zlib
+except ImportError:
+    zlib = None
 
 REFLECT_BIT_ORDER_TABLE = (
     0x00, 0x80, 0x40, 0xC0, 0x20, 0xA0, 0x60, 0xE0,
@@ -74,6 +79,56 @@ def reflectbitorder(width, value):
 
 
 
+def reflect32(value):
+    """ Reflects the bit order of a 32 bit value using the byte table."""
+    return (REFLECT_BIT_ORDER_TABLE[value & 0xFF] << 24 |
+            REFLECT_BIT_ORDER_TABLE[(value >> 8) & 0xFF] << 16 |
+            REFLECT_BIT_ORDER_TABLE[(value >> 16) & 0xFF] << 8 |
+            REFLECT_BIT_ORDER_TABLE[value >> 24])
+
+
+def _crc32Table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for i in range(0, 8):
+            crc = (crc >> 1) ^ 0xEDB88320 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+CRC32_TABLE = _crc32Table()
+
+
+def crc32(data, crc=0):
+    """ Standard (reflected) CRC-32 of data continuing from a previous crc32 result.
+
+        Uses zlib when available and a 256 entry table otherwise.
+    """
+    if zlib is not None:
+        return zlib.crc32(data, crc)
+    crc ^= 0xFFFFFFFF
+    table = CRC32_TABLE
+    for byte in data:
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def jamcrc(data):
+    """ JAMCRC of data, the bitwise NOT of its CRC-32."""
+    return crc32(data) ^ 0xFFFFFFFF
+
+
+@lru_cache(maxsize=1 << 16)
+def generalhash(string):
+    """ JAMCRC of a string's utf-8 encoding, as used for material and resource names."""
+    return jamcrc(string.encode())
+
+
+def hashMany(strings):
+    """ generalhash of every string in order, repeated names are served from the cache."""
+    return [generalhash(string) for string in strings]
+
+
 class CrccheckError(Exception):
     """General checksum error exception"""
     pass
@@ -341,6 +396,11 @@ class Crc32(CrcBase):
 
         reflect = self._reflect_input
         poly = self._poly
+        if reflect and poly == 0x04C11DB7:
+            # The register is kept unreflected and uncomplemented, crc32 works on the reflected complement
+            crc = crc32(bytes(data), reflect32(crc) ^ 0xFFFFFFFF) ^ 0xFFFFFFFF
+            self._value = reflect32(crc)
+            return self
         for byte in data:
             if reflect:
                 byte = REFLECT_BIT_ORDER_TABLE[byte]
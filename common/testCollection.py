@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:31 2026
+
+@author: AsteriskAmpersand
+"""
+import pytest
+
+def pytest_collect_directory(path, parent):
+    #The add-on __init__ imports bpy, directories are collected as plain folders so pytest never imports it
+    if path.joinpath("__init__.py").is_file():
+        return pytest.Dir.from_parent(parent, path = path)
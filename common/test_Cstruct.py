@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:31:40 2026
+
+@author: AsteriskAmpersand
+"""
+import struct
+from collections import OrderedDict
+
+import Cstruct as CS
+from FileLike import FileLike, MappedFileLike
+
+fields = OrderedDict([("headId","long"),
+                      ("flags","ubyte[12]"),
+                      ("count","ushort"),
+                      ("signed","short"),
+                      ("offset","uint64"),
+                      ("scale","float"),
+                      ("precise","double"),
+                      ("name","char[8]"),
+                      ("small","byte[3]")])
+values = {"headId":-5, "flags":list(range(12)), "count":0xFFFF, "signed":-300, "offset":0x123456789A,
+          "scale":0.5, "precise":-1.25, "name":"abc\x00\x00\x00\x00\x00", "small":[-1,0,1]}
+expected = struct.pack("<i12BHhQfd8s3b", -5, *range(12), 0xFFFF, -300, 0x123456789A, 0.5, -1.25, b"abc", -1, 0, 1)
+
+class Sample(CS.PyCStruct):
+    fields = fields
+
+def fieldwise(cstruct, data):
+    #The per field operators the compiled layout replaces
+    return b''.join([operator['serializer'](data[name]) for name, operator in cstruct.struct.items()])
+
+def test_compiledLayoutMatchesFieldwiseSerialization():
+    cstruct = CS.Cstruct(fields)
+    assert cstruct.layout is not None
+    assert len(cstruct) == len(expected)
+    assert cstruct.serialize(values) == expected
+    assert fieldwise(cstruct, values) == expected
+
+def test_compiledLayoutRoundTrips():
+    cstruct = CS.Cstruct(fields)
+    assert cstruct.marshall(FileLike(expected)) == values
+    assert cstruct.marshall(MappedFileLike(expected)) == values
+    assert cstruct.unpackFrom(b"\xff" + expected, 1) == values
+    buffer = bytearray(len(expected) + 2)
+    cstruct.packInto(buffer, 2, values)
+    assert bytes(buffer[2:]) == expected
+
+def test_pyCStructRoundTrips():
+    sample = Sample(FileLike(expected))
+    assert {name:getattr(sample, name) for name in fields} == values
+    assert sample.serialize() == expected
+    assert Sample(MappedFileLike(expected)).serialize() == expected
+
+def test_layoutsAreSharedAcrossInstances():
+    assert CS.Cstruct(fields).layout is CS.Cstruct(OrderedDict(fields)).layout
+
+def test_hfloatFallsBackToFieldwiseCodecs():
+    halfFields = OrderedDict([("u","hfloat"),("v","hfloat"),("id","ulong")])
+    cstruct = CS.Cstruct(halfFields)
+    assert cstruct.layout is None
+    data = struct.pack("<eeI", 0.5, -2.0, 7)
+    assert cstruct.marshall(FileLike(data)) == {"u":0.5, "v":-2.0, "id":7}
+    assert cstruct.serialize({"u":0.5, "v":-2.0, "id":7}) == data
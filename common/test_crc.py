@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 00:21:13 2026
+
+@author: AsteriskAmpersand
+"""
+import random
+import pytest
+
+import crc
+
+class BitwiseJamcrc(crc.CrcBase):
+    #The bit at a time register loop Crc32 used before the table and zlib paths
+    _width = 32
+    _poly = 0x04C11DB7
+    _initvalue = 0xFFFFFFFF
+    _reflect_input = True
+    _reflect_output = True
+    _xor_output = 0x00000000
+
+class BitwiseCrc32(BitwiseJamcrc):
+    _xor_output = 0xFFFFFFFF
+
+rnd = random.Random(0)
+samples = [b"", b"123456789", b"\x00", b"\xff"*7, "mat_a".encode(),
+           "pl\\f_equip\\pl000_0000\\body\\mod\\pl000_0000_body_BML".encode()] + \
+          [bytes(rnd.randrange(256) for _ in range(rnd.randrange(1, 300))) for _ in range(20)]
+
+@pytest.fixture(params = ["zlib", "table"])
+def backend(request, monkeypatch):
+    if request.param == "table":
+        monkeypatch.setattr(crc, "zlib", None)
+    return request.param
+
+def test_jamcrcMatchesBitwiseLoop(backend):
+    for data in samples:
+        assert crc.jamcrc(data) == BitwiseJamcrc.calc(data)
+        assert crc.CrcJamcrc.calc(data) == BitwiseJamcrc.calc(data)
+        assert crc.Crc32.calc(data) == BitwiseCrc32.calc(data)
+
+def test_incrementalProcessMatchesSinglePass(backend):
+    for data in samples:
+        inst = crc.CrcJamcrc()
+        for ix in range(0, len(data), 7):
+            inst.process(data[ix:ix+7])
+        assert inst.final() == BitwiseJamcrc.calc(data)
+        assert crc.crc32(data[5:], crc.crc32(data[:5])) == crc.crc32(data)
+
+def test_selftests(backend):
+    crc.Crc32.selftest()
+    crc.CrcJamcrc.selftest()
+    assert crc.jamcrc(b"123456789") == 0x340BC6D9
+
+def test_generalhashAndHashMany():
+    names = ["mat_a", "mat_b", "mat_a", "Ünïcode"]
+    expected = [BitwiseJamcrc.calc(name.encode()) for name in names]
+    assert [crc.generalhash(name) for name in names] == expected
+    assert crc.hashMany(names) == expected
@@ -4,6 +4,7 @@ Created on Fri Feb  8 02:25:07 2019
 
 @author: AsteriskAmpersand
 """
+import numpy as np
 try:
     from ..common import Cstruct as CS
 except:
@@ -19,7 +20,7 @@ class CMatrix():
         
     def marshall(self,data):
         #TODO - Sanity check on data dimensions
-        return [self.CColMat.marshall(data)["column"] for col in range(self.columnCount)]
+        return np.frombuffer(data.read(len(self)), dtype = '<f4').reshape(self.columnCount, self.rowCount).tolist()
     
     def serialize(self, matrix):
         #TODO - Sanity check on data dimensions
@@ -59,11 +60,8 @@ class Matrix():
     @staticmethod
     def mul(a,b):
         #TODO - Sanity check on dimensions of both
-        c = [[0]*len(a[0]) for _ in range(len(b))]
-        for row in range(len(a[0])):
-            for column in range(len(b)):
-                c[column][row] = sum([a[iteration][row]*b[column][iteration] for iteration in range(len(a[0]))])
-        return c
+        #Column lists are the transposed matrices so A*B is B^T@A^T
+        return (np.array(b, dtype = np.float64) @ np.array(a, dtype = np.float64)).tolist()
     
     def __mul__(self, matrixB):
         #TODO - Sanity check on dimensions of both
@@ -98,38 +96,13 @@ class Matrix():
     
     @staticmethod
     def getDeterminant(m):
-        #base case for 2x2 matrix
-        if len(m) == 2:
-            return m[0][0]*m[1][1]-m[0][1]*m[1][0]
-    
-        determinant = 0
-        for c in range(len(m)):
-            determinant += ((-1)**c)*m[0][c]*Matrix.getDeterminant(Matrix.getMinor(m,0,c))
-        return determinant
+        return float(np.linalg.det(np.array(m, dtype = np.float64)))
     def det(self):
         return self.getDeterminant(self.matrix)
         
     @staticmethod
     def getInverse(m):
-        determinant = Matrix.getDeterminant(m)
-        #special case for 2x2 matrix:
-        if len(m) == 2:
-            return [[m[1][1]/determinant, -1*m[0][1]/determinant],
-                    [-1*m[1][0]/determinant, m[0][0]/determinant]]
-    
-        #find matrix of cofactors
-        cofactors = []
-        for r in range(len(m)):
-            cofactorRow = []
-            for c in range(len(m)):
-                minor = Matrix.getMinor(m,r,c)
-                cofactorRow.append(((-1)**(r+c)) * Matrix.getDeterminant(minor))
-            cofactors.append(cofactorRow)
-        cofactors = Matrix.transposeMatrix(cofactors)
-        for r in range(len(cofactors)):
-            for c in range(len(cofactors)):
-                cofactors[r][c] = cofactors[r][c]/determinant
-        return cofactors
+        return np.linalg.inv(np.array(m, dtype = np.float64)).tolist()
     def invert(self):
         result = Matrix(self.dimensions)
         result.matrix = Matrix.getInverse(self.matrix)
@@ -170,6 +143,17 @@ class Matrix():
     def marshall(self,data):
         self.matrix = self.cMatrix.marshall(data)
         
+    @classmethod
+    def fromArray(cls, array):
+        #Array in the file layout, one row per column
+        array = np.asarray(array)
+        result = cls((array.shape[1], array.shape[0]))
+        result.matrix = array.tolist()
+        return result
+    
+    def array(self):
+        return np.array(self.matrix, dtype = np.float32)
+        
     def construct(self, matrix):
         self.matrix = [[matrix[row][col] for row in range(self.dimensions[0])] for col in range(self.dimensions[1])]
         
@@ -192,4 +176,60 @@ class Matrix():
         return self.matrix
     
     def maxima(self):
-        return max(map(max, self.matrix))
\ No newline at end of file
+        return max(map(max, self.matrix))
+
+def readMatrices(data, count):
+    """Reads count consecutive 4x4 float matrices as a (count,4,4) float32 array in the file layout.
+    
+    Each matrix is stored column by column, so every array entry is the transpose of the matrix.
+    """
+    return np.frombuffer(data.read(64*count), dtype = '<f4', count = 16*count).reshape(count,4,4).copy()
+
+def matricesFromRows(matrices):
+    #Row indexable matrices (nested lists, mathutils) into the file layout
+    if isinstance(matrices, np.ndarray):
+        rows = matrices.astype(np.float64)
+    else:
+        rows = np.array([[[matrix[row][col] for col in range(4)] for row in range(4)] for matrix in matrices], dtype = np.float64)
+    return rows.reshape(-1,4,4).transpose(0,2,1).astype(np.float32)
+
+def invertMatrices(matrices):
+    #The inverse of the transpose is the transpose of the inverse, file layout is kept
+    return np.linalg.inv(np.asarray(matrices, dtype = np.float64))
+
+def composeMatrices(a, b):
+    #Batched A*B of file layout matrices
+    return np.matmul(np.asarray(b, dtype = np.float64), np.asarray(a, dtype = np.float64))
+
+def boneDepths(parentIds):
+    """Depth of every bone in the hierarchy, parentId 255 marks a root."""
+    parents = np.asarray(parentIds, dtype = np.int64)
+    parents = np.where(parents == 255, -1, parents)
+    if np.any(parents >= len(parents)):
+        raise ValueError("Bone parent out of range for %d bones"%len(parents))
+    depths = np.zeros(len(parents), dtype = np.int64)
+    ancestors = parents.copy()
+    for _ in range(len(parents)+1):
+        live = ancestors >= 0
+        if not live.any():
+            return depths
+        depths += live
+        ancestors[live] = parents[ancestors[live]]
+    raise ValueError("Bone hierarchy contains a cycle")
+
+def absoluteMatrices(lmatrices, parentIds):
+    """Absolute matrices of every bone, AMat = LMat.inverted() * AMat of the parent.
+    
+    Resolved one hierarchy depth at a time so every level is a single batched product.
+    """
+    parents = np.asarray(parentIds, dtype = np.int64)
+    depths = boneDepths(parents)
+    inverses = invertMatrices(lmatrices)
+    absolute = np.empty_like(inverses)
+    for depth in range(int(depths.max())+1 if len(depths) else 0):
+        level = np.flatnonzero(depths == depth)
+        if depth == 0:
+            absolute[level] = inverses[level]
+        else:
+            absolute[level] = composeMatrices(inverses[level], absolute[parents[level]])
+    return absolute.astype(np.float32)
@@ -4,18 +4,22 @@ Created on Tue Feb 12 13:18:43 2019
 
 @author: AsteriskAmpersand
 """
+import io
 try:
     from ..mod3 import Mod3Components as Mod3C
     from ..mod3 import Mod3Mesh as Mod3M
     from ..mod3 import Mod3Skeleton as Mod3S
     from ..mod3.Mod3VertexBuffers import Mod3Vertex
+    from ..common.FileLike import MappedFileLike
 except:
     import sys
     sys.path.insert(0, r'..\mod3')
+    sys.path.insert(0, r'..\common')
     import Mod3Components as Mod3C
     import Mod3Mesh as Mod3M
     import Mod3Skeleton as Mod3S
     from Mod3VertexBuffers import Mod3Vertex    
+    from FileLike import MappedFileLike
 
 class Mod3():    
     def __init__(self):
@@ -26,23 +30,51 @@ class Mod3():
         self.MeshParts = Mod3M.Mod3MeshCollection
         self.Trailing = Mod3C.GenericRemnants
         
-    def marshall(self, data):
-        self.Header = self.Header()
+    def marshall(self, data, meshFilter = None, lazyGeometry = False):
+        #With lazyGeometry meshpart vertices and faces are read on first use, data has to stay open
+        self.marshallHeader(data)
+        self.marshallSkeleton(data)
+        self.marshallGroupProperties(data)
+        self.marshallMaterials(data)
+        self.marshallMeshParts(data, lazy = lazyGeometry, meshFilter = meshFilter)
+        self.marshallTrailing(data)
+        
+    def marshallHeader(self, data):
+        self.Header = Mod3C.MOD3Header()
         self.Header.marshall(data)
+        
+    def marshallSkeleton(self, data):
         data.seek(self.Header.boneOffset)
-        self.Skeleton = self.Skeleton(self.Header.boneCount, self.Header.boneMapCount)
+        self.Skeleton = Mod3S.Mod3SkelletalStructure(self.Header.boneCount, self.Header.boneMapCount)
         self.Skeleton.marshall(data)
+        
+    def marshallGroupProperties(self, data):
         data.seek(self.Header.groupOffset)
-        self.GroupProperties = self.GroupProperties(self.Header.groupCount)
+        self.GroupProperties = Mod3C.Mod3GroupProperties(self.Header.groupCount)
         self.GroupProperties.marshall(data)
+        
+    def marshallMaterials(self, data):
         data.seek(self.Header.materialNamesOffset)
-        self.Materials = self.Materials(self.Header.materialCount)
+        self.Materials = Mod3C.Mod3Materials(self.Header.materialCount)
         self.Materials.marshall(data)
+        
+    def marshallMeshParts(self, data, lazy = False, meshFilter = None):
         data.seek(self.Header.meshOffset)
-        self.MeshParts = self.MeshParts(self.Header.meshCount, self.Header.vertexOffset, self.Header.facesOffset)
-        self.MeshParts.marshall(data)
+        self.MeshParts = Mod3M.Mod3MeshCollection(self.Header.meshCount, self.Header.vertexOffset, self.Header.facesOffset)
+        self.MeshParts.marshall(data, lazy, meshFilter)
+        
+    def marshallMeshPart(self, data, index):
+        #Reads a single meshpart header and its geometry, the file header must already be read
+        if not 0 <= index < self.Header.meshCount:
+            raise IndexError("Meshpart %d out of range for %d meshparts"%(index, self.Header.meshCount))
+        data.seek(self.Header.meshOffset + index*len(Mod3M.Mod3MeshPartHeader()))
+        mesh = Mod3M.Mod3Mesh(self.Header.vertexOffset, self.Header.facesOffset)
+        mesh.marshall(data)
+        return mesh
+        
+    def marshallTrailing(self, data):
         data.seek(self.Header.unknOffset)
-        self.Trailing = self.Trailing()
+        self.Trailing = Mod3C.GenericRemnants()
         self.Trailing.marshall(data)
 
     def construct(self, fileHeader, materials, groupStuff, skeleton, lmatrices, amatrices, meshparts, meshData, trailingData):
@@ -70,10 +102,6 @@ class Mod3():
         self.MeshParts.verify()
         self.Trailing.verify()
 
-    @staticmethod
-    def pad(current,finalposition):
-        return b''.join([b'\x00']*(finalposition-current))
-           
     def calculateCountsOffsets(self):
         #TODO - Sanity Checks
         vCount, fCount, vBufferLen = self.MeshParts.updateCountsOffsets()
@@ -89,7 +117,8 @@ class Mod3():
         self.Header.vertexCount = vCount
         #("faceCount","long"),
         self.Header.faceCount = fCount*3
-        #("vertexIds","long"),#notModifiedEver
+        #("vertexIds","long"),#num_edges
+        self.Header.vertexIds = self.MeshParts.getEdgeCount()
         #("vertexBufferSize","long"),#length of vertices section
         self.Header.vertexBufferSize = vBufferLen
         #("secondBufferSize","long"),#unused
@@ -118,20 +147,38 @@ class Mod3():
     def align(offset, grid = 16):
         return offset+(grid - offset%grid if offset%grid else 0)
     
+    @staticmethod
+    def padTo(fileobj, finalposition):
+        #An offset of 0 marks an absent section, there is nothing to pad to
+        if not finalposition:
+            return
+        current = fileobj.tell()
+        if current > finalposition:
+            raise ValueError("Section overruns the next section offset %d by %d bytes"%(finalposition, current-finalposition))
+        fileobj.write(bytes(finalposition-current))
+    
+    def write(self, fileobj, release = False):
+        """Streams the model to a seekable binary file, offsets must already be calculated.
+        
+        Meshpart geometry is encoded as it is written. With release each meshpart's geometry
+        is dropped once written and the model can not be written again.
+        """
+        fileobj.write(self.Header.serialize())
+        self.padTo(fileobj, self.Header.boneOffset)
+        fileobj.write(self.Skeleton.serialize())
+        self.padTo(fileobj, self.Header.groupOffset)
+        fileobj.write(self.GroupProperties.serialize())
+        self.padTo(fileobj, self.Header.materialNamesOffset)
+        fileobj.write(self.Materials.serialize())
+        self.padTo(fileobj, self.Header.meshOffset)
+        self.MeshParts.write(fileobj, release)
+        self.padTo(fileobj, self.Header.unknOffset)
+        fileobj.write(self.Trailing.serialize())
+    
     def serialize(self):
-        serialization = b''
-        serialization+=self.Header.serialize()
-        serialization+=self.pad(len(serialization),self.Header.boneOffset)
-        serialization+=self.Skeleton.serialize()
-        serialization+=self.pad(len(serialization),self.Header.groupOffset)
-        serialization+=self.GroupProperties.serialize()
-        serialization+=self.pad(len(serialization),self.Header.materialNamesOffset)
-        serialization+=self.Materials.serialize()
-        serialization+=self.pad(len(serialization),self.Header.meshOffset)
-        serialization+=self.MeshParts.serialize()
-        serialization+=self.pad(len(serialization),self.Header.unknOffset)
-        serialization+=self.Trailing.serialize()
-        return serialization
+        serialization = io.BytesIO()
+        self.write(serialization)
+        return serialization.getvalue()
     
     def sceneProperties(self):
         sceneProp = self.Header.sceneProperties()
@@ -142,24 +189,63 @@ class Mod3():
         return sceneProp
     
     def prepareArmature(self):
-        return self.Skeleton.traditionalSkeletonStructure()  
+        return self.Skeleton.armatureStructure()  
 
     def meshProperties(self):
         return self.MeshParts.sceneProperties()
     
-    def prepareMeshparts(self, weightSplit):
-        meshes = []
-        for traditionalMesh in self.MeshParts.traditionalMeshStructure(weightSplit):
-            traditionalMesh["properties"]["material"] = self.Materials[traditionalMesh["properties"]["materialIdx"]]
-            traditionalMesh["properties"].pop("materialIdx")
-            traditionalMesh["properties"]["blockLabel"] = Mod3Vertex.blocklist[traditionalMesh["properties"]["blocktype"]]["name"]
-            traditionalMesh["properties"].pop("blocktype")
-            meshes.append(traditionalMesh)
-        return meshes
+    def prepareMeshparts(self, weightSplit, release = False):
+        """Yields a MeshPartIR per meshpart, one at a time.
+        
+        With release each meshpart's geometry is dropped as soon as its IR is built, so only
+        the meshpart being handed off is decoded in memory. The collection keeps its meshparts
+        but their geometry can not be read or written again.
+        """
+        for mesh in self.MeshParts.Meshes:
+            meshpart = mesh.meshPartIR(weightSplit)
+            if release:
+                mesh.release()
+            meshpart.properties["material"] = self.Materials[meshpart.properties.pop("materialIdx")]
+            meshpart.properties["blockLabel"] = Mod3Vertex.blocklist[meshpart.properties.pop("blocktype")]["name"]
+            yield meshpart
     
     def filterLOD(self):
         self.MeshParts.filterLOD()
 
+class LazyMod3(Mod3):
+    """Mod3 that only parses the file header and the meshpart headers on marshall.
+    
+    Skeleton, group properties, materials and trailing data are decoded from the header
+    offsets the first time they are accessed, and each meshpart's vertices and faces the
+    first time they are used. The source has to stay open until the needed sections are read.
+    """
+    lazySections = {"Skeleton":Mod3.marshallSkeleton,
+                    "GroupProperties":Mod3.marshallGroupProperties,
+                    "Materials":Mod3.marshallMaterials,
+                    "Trailing":Mod3.marshallTrailing}
+    
+    def marshall(self, data, meshFilter = None):
+        self.source = data
+        for section in self.lazySections:
+            self.__dict__.pop(section, None)
+        self.marshallHeader(data)
+        self.marshallMeshParts(data, lazy = True, meshFilter = meshFilter)
+        
+    def __getattr__(self, name):
+        if name in self.lazySections and self.__dict__.get("source") is not None:
+            position = self.source.tell()
+            self.lazySections[name](self, self.source)
+            self.source.seek(position)
+            return self.__dict__[name]
+        raise AttributeError("'%s' object has no attribute '%s'"%(type(self).__name__, name))
+
+def readMeshPart(path, index):
+    """Decodes only meshpart index of a .mod3 file, reading its header and vertex and face ranges."""
+    with MappedFileLike.fromPath(path) as data:
+        model = Mod3()
+        model.marshallHeader(data)
+        return model.marshallMeshPart(data, index)
+
 def doublesidedEval(v1, v2):
     if v1 != v2:
         print(v1)
@@ -5,6 +5,7 @@ Created on Thu Mar 14 00:15:18 2019
 @author: AsteriskAmpersand
 """
 
+import numpy as np
 try:
     from ..mod3 import Mod3
     from ..mod3 import Mod3VertexBuffers as Mod3Vert
@@ -50,9 +51,15 @@ class ExporterSettings():
                 materialList.append(meshprops["material"])
         return idx
     
-    def polyfaces(self, face):
-        self.errorHandler.polyFace()
-        return [{"v1":vert0, "v2":vert1, "v3":vert2} for vert0, vert1, vert2 in zip(face[:-2], face[1:-1], face[2:])]
+    def polyfaces(self, loopStarts, loopTotals, loopVertices):
+        #Polygons as triangle strips over their loops, (F,3) vertex indices
+        loopStarts, loopTotals = np.asarray(loopStarts, dtype = np.int64), np.asarray(loopTotals, dtype = np.int64)
+        for _ in range(int(np.count_nonzero(loopTotals>3))):
+            self.errorHandler.polyFace()
+        triangleCounts = np.maximum(loopTotals-2, 0)
+        firstLoops = np.repeat(loopStarts, triangleCounts) + \
+                        np.arange(triangleCounts.sum()) - np.repeat(np.cumsum(triangleCounts)-triangleCounts, triangleCounts)
+        return np.asarray(loopVertices, dtype = np.int64)[firstLoops[:,None] + np.arange(3)]
         
     
     def validateSkeletonRoot(self, rootEmpty):
@@ -83,15 +90,16 @@ class ModelToMod3():
             self.api.showMessageBox("Export Process failed due to an Error. Check the cause in Window > Toggle_System_Console")
             return
         self.model.construct(fileHeader, materials, groupStuff, skeleton, lmatrices, amatrices, meshparts, meshData, trailingData)
-        file = open(context,"wb")
-        file.write(self.model.serialize())
-        file.close()
+        #The model holds the only remaining reference to each meshpart and releases it once written
+        del meshparts
+        with open(context,"wb") as file:
+            self.model.write(file, release = True)
         
     def analyzeMeshparts(self, meshparts):
         for meshpart in meshparts:
-            self.options.errorHandler.setMeshName(meshpart["meshname"])
-            meshpart["properties"]["blocktype"] = self.confirmBlockType(meshpart["properties"]["blocktype"], meshpart["mesh"])
-            self.compatibilizeMesh(Mod3Vert.Mod3Vertex.blocklist[meshpart["properties"]["blocktype"]], meshpart["mesh"])
+            self.options.errorHandler.setMeshName(meshpart.name)
+            meshpart.properties["blocktype"] = self.confirmBlockType(meshpart.properties["blocktype"], meshpart)
+            self.compatibilizeMesh(Mod3Vert.Mod3Vertex.blocklist[meshpart.properties["blocktype"]], meshpart)
         self.options.executeErrors()
         
     
@@ -101,23 +109,21 @@ class ModelToMod3():
 ###############################################################################
 ###############################################################################
     
-    def compatibilizeMesh(self, blockProperties, mesh):
-        for vertex in mesh:
-            for _ in range(blockProperties["uvs"]-len(vertex["uvs"])):
-                vertex["uvs"].append(vertex["uvs"][0])
-            vertex["weights"] = vertex["weights"].execute(blockProperties["weights"] if "weights" in blockProperties else 0)
-            if "colour" in blockProperties and "colour" not in vertex:
-                vertex["colour"]=[0,0,0,255]
+    def compatibilizeMesh(self, blockProperties, meshpart):
+        meshpart.padUVs(blockProperties["uvs"])
+        meshpart.resolveWeights(blockProperties["weights"] if "weights" in blockProperties else 0)
+        if "colour" in blockProperties and meshpart.colours is None:
+            meshpart.colours = np.tile([0,0,0,255], (meshpart.vertexCount(),1))
         return
             
-    def confirmBlockType(self, blocktype, IntermediateVertexList):
+    def confirmBlockType(self, blocktype, meshpart):
         coercion_condition = blocktype in Mod3Vert.Mod3Vertex.blocklist and \
                 "weights" in Mod3Vert.Mod3Vertex.blocklist[blocktype] and\
                 Mod3Vert.Mod3Vertex.blocklist[blocktype]["weights"]==8
         if coercion_condition:
             temp = self.options.errorHandler.coerce
             self.options.errorHandler.coerce = False                                    
-        properties = self.detectVertexProperties(IntermediateVertexList)
+        properties = self.detectVertexProperties(meshpart)
         suggestion = self.decideMinimumBlocktype(properties)
         if blocktype is not None:
             compatible = self.blocktypeCompatibility(blocktype, properties)
@@ -152,23 +158,25 @@ class ModelToMod3():
         return self.invertedBlocklist[search]
     
     @staticmethod
-    def weightDecision(vertexList):
-        weightClass = max([vertex["weights"].weightClass() for vertex in vertexList],default = 0)
+    def weightDecision(meshpart):
+        if meshpart.bufferedWeights is None:
+            return meshpart.weightCount()
+        weightClass = max([weights.weightClass() for weights in meshpart.bufferedWeights],default = 0)
         return weightClass
     
     @staticmethod
-    def uvDecision(vertexList):
-        total = len(vertexList[0]["uvs"]) if vertexList else 1
+    def uvDecision(meshpart):
+        total = meshpart.uvCount() if meshpart.vertexCount() else 1
         if total > 4:
             raise UVCountError
         return total
     
     @staticmethod
-    def colourDecision(vertexList):
-        return any(["colour" in vert for vert in vertexList])
+    def colourDecision(meshpart):
+        return meshpart.colours is not None and meshpart.vertexCount() > 0
     
-    def detectVertexProperties(self,VertexList):
-        weightCount = self.weightDecision(VertexList)
-        uvs = self.uvDecision(VertexList)
-        colour = self.colourDecision(VertexList)
+    def detectVertexProperties(self,meshpart):
+        weightCount = self.weightDecision(meshpart)
+        uvs = self.uvDecision(meshpart)
+        colour = self.colourDecision(meshpart)
         return {"weights":weightCount, "uvs":uvs, "colour":colour}
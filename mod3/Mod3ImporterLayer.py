@@ -6,15 +6,19 @@ Created on Sun Feb 24 18:22:05 2019
 """
 try:
     from ..mod3 import Mod3
+    from ..mod3.Mod3Mesh import highestLOD
     from ..mrl3 import Mrl3
-    from ..mrl3 import TextureConverter
+    from ..mrl3.ChunkIndex import ChunkIndex, getChunkIndex
+    from ..mrl3.TextureConverter import textureCache, decodesInProcess
 except:
     import sys
     sys.path.insert(0, r'..\mod3')
     sys.path.insert(0, r'..\mrl3')
     import Mod3
+    from Mod3Mesh import highestLOD
     import Mrl3
-    import TextureConverter    
+    from ChunkIndex import ChunkIndex, getChunkIndex
+    from TextureConverter import textureCache, decodesInProcess
 
 
 class CorruptModel(Exception):
@@ -23,8 +27,9 @@ class CorruptModel(Exception):
 class Mod3ToModel():
     def __init__(self, Mod3File, Api, options):
         model = Mod3.Mod3()
+        meshFilter = highestLOD if "Only Highest LOD" in options else None
         try:
-            model.marshall(Mod3File)
+            model.marshall(Mod3File, meshFilter, lazyGeometry = True)
         except:
             raise CorruptModel("Model does not adhere to Mod3 spec. If this file was produced by the previous importer try importing with LOD filtered to highest only.")
         self.model = model
@@ -47,8 +52,6 @@ class Mod3ToModel():
             skeletonOperator = { 
                         "Armature":self.createArmature}[options["Skeleton"]]
             excecute.append(lambda c: skeletonOperator(c))
-        if "Only Highest LOD" in options:
-            excecute.append(lambda c: self.filterToHighestLOD(c))
         if "Mesh Parts" in options:
             excecute.append(lambda c: self.createMeshParts(c))
             if "Import Textures" in options:
@@ -83,7 +86,14 @@ class Mod3ToModel():
         self.api.createArmature(self.model.prepareArmature(),c)
         
     def createMeshParts(self,c):
-        self.api.createMeshParts(self.model.prepareMeshparts(self.splitWeights),c)
+        self.api.createMeshParts(self.preparedMeshparts(),c)
+        
+    def preparedMeshparts(self):
+        #Geometry is decoded per meshpart as the api consumes it, so corrupt buffers surface here
+        try:
+            yield from self.model.prepareMeshparts(self.splitWeights, release = True)
+        except Exception as e:
+            raise CorruptModel("Meshpart geometry does not adhere to Mod3 spec.") from e
         
     def clearScene(self,c):
         self.api.clearScene(c)
@@ -98,25 +108,37 @@ class Mod3ToModel():
         self.api.linkArmature(c)
         
     def importTextures(self,c,chunkpath):
-        self.material = Mrl3.MRL3()
         materialPath = c.path[:-5]+".mrl3"
         try:
-            materialFile = open(materialPath,"rb")
-        except:
+            self.material = Mrl3.materialCache.load(materialPath)
+        except OSError:
             print("No MRL3 found in model directory")
             return
-        try:
-            self.material.marshall(materialFile)
         except Exception as e:
             print("Unable to read corrupted MRL3")
             print(str(e))
             return
-        self.api.importTextures(lambda skinHash: materialPathForkingResolution(c.path, self.material[skinHash], chunkpath),c)        
-        
+        folderIndex = ChunkIndex(os.path.dirname(os.path.abspath(c.path)), recursive = False).refresh()
+        chunkIndex = getChunkIndex(chunkpath) if chunkpath else None
+        sources = {}
+        for ix in range(self.model.Materials.Count()):
+            materialName = self.model.Materials[ix].replace("\x00","")
+            try:
+                source = materialTextureSource(self.material[materialName], folderIndex, chunkIndex)
+            except KeyError:
+                continue
+            if source:
+                sources[materialName] = source
+        #Formats the in process decoders reject go through the converter cache in parallel
+        fallbacks = textureCache.convertAll(source for source in sources.values() if not decodesInProcess(source))
+        for materialName, source in list(sources.items()):
+            if source in fallbacks:
+                if fallbacks[source] is None:
+                    del sources[materialName]
+                else:
+                    sources[materialName] = fallbacks[source]+".png"
+        self.api.importTextures(lambda skinHash: sources[skinHash],c)        
         
-    def filterToHighestLOD(self,c):
-        self.model.filterLOD()
-        return
 
 ###############################################################################
 ###############################################################################
@@ -125,19 +147,16 @@ class Mod3ToModel():
 ###############################################################################
 import os
 
-def materialPathForkingResolution(modelPath, texturePath, chunkPath):
-    filename = os.path.basename(texturePath)
-    modelFolder = os.path.dirname(os.path.abspath(modelPath))
-    pathCandidates = [os.path.join(modelFolder,filename), os.path.join(chunkPath,texturePath)]
-    for path in pathCandidates:
-        if os.path.exists(path+".png"):
-            return path
-        elif os.path.exists(path+".dds"):
-            TextureConverter.convertDDSToPNG(path+".dds")
-            return path
-        elif os.path.exists(path+".tex"):
-            TextureConverter.convertTexToDDS(path+".tex")
-            TextureConverter.convertDDSToPNG(path+".dds")
-            return path
+def materialTextureSource(texturePath, folderIndex, chunkIndex):
+    #Best source file for an MRL3 texture path, model folder before chunk and png > dds > tex
+    pathCandidates = [(folderIndex, os.path.basename(texturePath.replace("\\","/"))), (chunkIndex, texturePath)]
+    for index, relativePath in pathCandidates:
+        entry = index.lookup(relativePath) if index is not None else None
+        if entry is None:
+            continue
+        path, extensions = entry
+        for extension in (".png", ".dds", ".tex"):
+            if extension in extensions:
+                return path+extension
     return 
     #TODO - Here be Dragons
\ No newline at end of file
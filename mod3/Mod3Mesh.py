@@ -6,15 +6,22 @@ Created on Tue Mar  5 22:36:21 2019
 """
 
 from collections import OrderedDict, Counter
+import numpy as np
 try:
     from ..common import Cstruct as CS
     from ..mod3.Mod3VertexBuffers import Mod3Vertex
+    from ..mod3 import Mod3VertexArrays as Mod3VA
+    from ..mod3.Mod3Topology import MeshTopology
+    from ..mod3.Mod3MeshIR import MeshPartIR
 except:
     import sys
     sys.path.insert(0, r'..\common')
     sys.path.insert(0, r'..\mod3')
     import Cstruct as CS
     from Mod3VertexBuffers import Mod3Vertex    
+    import Mod3VertexArrays as Mod3VA
+    from Mod3Topology import MeshTopology
+    from Mod3MeshIR import MeshPartIR
     
 class Mod3MeshPartHeader(CS.PyCStruct):
     fields = OrderedDict([
@@ -47,47 +54,112 @@ class Mod3Mesh():
 #Header+Vertex+Faces
     def __init__(self, vertexOffset, faceOffset):
         self.Header = Mod3MeshPartHeader()
+        self.source = None
+        self.pending = None
+        self.VertexBlock = None
         self.Vertices = []
-        self.Faces = []
+        self.Faces = np.zeros((0,3), dtype = np.uint16)
+        self.Topology = None
         self.vertexOffset = vertexOffset
         self.faceOffset = faceOffset
         
-    def marshall(self, data):
+    @property
+    def VertexBlock(self):
+        vertices = self.materializedVertices()
+        if vertices is not None:
+            return Mod3VA.blockFromVertices(vertices, self.Header.blocktype)
+        return self._vertexBlock
+    
+    @VertexBlock.setter
+    def VertexBlock(self, vertexBlock):
+        if self.source is not None:
+            self.marshallGeometry()
+        self._vertexBlock = vertexBlock
+        self._vertices = None
+        
+    @property
+    def Faces(self):
+        if self.source is not None:
+            self.marshallGeometry()
+        return self._faces
+    
+    @Faces.setter
+    def Faces(self, faces):
+        if self.source is not None:
+            self.marshallGeometry()
+        self._faces = faces
+        
+    @property
+    def Vertices(self):
+        if self.materializedVertices() is None:
+            self._vertices = Mod3VA.vertexObjects(self._vertexBlock, self.Header.blocktype)
+            self._vertexBlock = None
+        return self._vertices
+    
+    @Vertices.setter
+    def Vertices(self, vertices):
+        self._vertices = vertices
+        
+    def materializedVertices(self):
+        #Once handed out the vertex objects are the geometry, edits to them are what gets written
+        if self.source is not None:
+            self.marshallGeometry()
+        return self._vertices
+        
+    def marshall(self, data, lazy = False):
         self.Header.marshall(data)
+        self.source = data
+        if not lazy:
+            self.marshallGeometry()
+            
+    def marshallGeometry(self):
+        #Vertices and faces live in the shared buffers after the meshpart headers
+        data, self.source = self.source, None
+        if data.closed:
+            raise ValueError("Meshpart geometry was not read before its source was closed")
         position = data.tell()
         data.seek((self.vertexOffset+self.Header.vertexOffset)+(self.Header.blockSize*(self.Header.vertexSub+self.Header.vertexBase)))
-        self.Vertices = [Mod3Vertex(self.Header.blocktype) for _ in range(self.Header.vertexCount)]
-        for vert in self.Vertices:
-            vert.marshall(data)
-        self.Faces = [Mod3Face() for _ in range(self.Header.faceCount//3)]
+        self.VertexBlock = Mod3VA.readVertexBlock(data, self.Header.blocktype, self.Header.vertexCount)
         data.seek(self.faceOffset+self.Header.faceOffset*2)
-        for face in self.Faces:
-            face.marshall(data)
+        faceCount = self.Header.faceCount//3
+        self.Faces = np.frombuffer(data.read(faceCount*len(Mod3Face())), dtype = '<u2', count = faceCount*3).reshape(-1,3).astype(np.uint16)
         data.seek(position)
         
-    #{"mesh":pymesh, "faces":faces, "properties":meshProp, "meshname":mesh.name}
-    def construct(self, mesh):
-        header = mesh["properties"]
-        faces = mesh["faces"]
-        vertices = mesh["mesh"]
-        self.Header.construct(header)
-        self.Header.blockSize = len(Mod3Vertex(self.Header.blocktype))
-        self.Faces = [Mod3Face() for _ in faces]
-        for modface, blenface in zip(self.Faces, faces):
-            modface.construct(blenface)
-        self.Vertices = [Mod3Vertex(self.Header.blocktype) for _ in vertices]
-        for modvert, blenvert in zip(self.Vertices,vertices):
-            modvert.construct(blenvert)
+    def releaseVertices(self):
+        self.pending = None
+        self._vertexBlock = None
+        self._vertices = None
+        
+    def release(self):
+        #Drops the decoded geometry and the reference to the source, it is not read again
+        self.source = None
+        self.releaseVertices()
+        self._faces = np.zeros((0,3), dtype = np.uint16)
+        self.Topology = None
+        
+    def construct(self, meshpart):
+        #meshpart is a MeshPartIR with its weights resolved, its vertices are encoded when written
+        self.Header.construct(meshpart.properties)
+        self.Header.blockSize = Mod3VA.blockDtype(self.Header.blocktype).itemsize
+        self.Faces = meshpart.faces.astype(np.uint16).reshape(-1,3)
+        self.pending = meshpart
+        self.VertexBlock = None
             
     def verify(self):
         self.Header.verify()
-        [(v.verify(),f.verify()) for v,f in zip(self.Vertices,self.Faces)]
+        vertices = self.materializedVertices()
+        if vertices is not None:
+            [v.verify() for v in vertices]
+        if self.Faces.ndim != 2 or self.Faces.shape[1] != 3:
+            raise AssertionError("Face buffer is not a triangle list.")
         
+    def serializeVertices(self):
+        if self.pending is not None:
+            return Mod3VA.encodeVertices(self.pending.vertexColumns(), self.Header.blocktype).tobytes()
+        return self.VertexBlock.tobytes()
         
-    def serialize(self):
-        return self.Header.serialize(), \
-                b''.join([vertex.serialize() for vertex in self.Vertices]), \
-                b''.join([face.serialize() for face in self.Faces])
+    def serializeFaces(self):
+        return self.Faces.astype('<u2').tobytes()
 
     def updateCounts(self):
         self.Header.vertexCount = self.vertexCount()
@@ -118,7 +190,7 @@ class Mod3Mesh():
         if currentOffset % 2:
             raise ValueError("Uneven face offset")
         self.Header.faceOffset = currentOffset//2
-        return self.faceCount()*len(Mod3Face())+currentOffset    
+        return self.faceBuffer()+currentOffset    
     
     @staticmethod
     def splitWeightFunction(zippedWeightBones, slash = False):
@@ -160,44 +232,76 @@ class Mod3Mesh():
                                             1:Mod3Mesh.splitWeightFunction,
                                             2:Mod3Mesh.slashWeightFunction
                                             }[x]
-    def decomposeVertices(self, vertices, splitWeights):
-        additionalFields = Mod3Vertex.blocklist[self.Header.blocktype]
+    @staticmethod
+    def unifiedWeightGroups(boneIds, weights):
+        #Repeated bones of a vertex are summed and clamped, groups come in order of first use
+        vertexCount, weightCount = boneIds.shape
+        keys, inverse = np.unique(np.repeat(np.arange(vertexCount), weightCount)*256 + boneIds.ravel(), return_inverse = True)
+        sums = np.clip(np.bincount(inverse.ravel(), weights = weights.ravel(), minlength = len(keys)), 0.0, 1.0)
+        vertices, bones = keys // 256, keys % 256
+        usedBones, firstUse = np.unique(bones, return_index = True)
+        order = np.lexsort((vertices, bones))
+        starts = np.searchsorted(bones[order], usedBones)
+        ends = np.append(starts[1:], len(order))
+        groups = {}
+        for ix in np.argsort(firstUse, kind = 'stable'):
+            members = order[starts[ix]:ends[ix]]
+            groups[int(usedBones[ix])] = (vertices[members], sums[members])
+        return groups
+    
+    @staticmethod
+    def weightGroups(boneIds, weights, splitWeights):
+        """Named vertex groups {name:(vertexIndices, weights)} for a weight format."""
+        if not splitWeights:
+            return Mod3Mesh.unifiedWeightGroups(boneIds, weights)
         weightGroups = {}
-        colour = []        
-        if "weights" in additionalFields:
-            weightFunction = self.weightFunctionSelector(splitWeights)
-            for ix, vertex in enumerate(vertices):
-                self.dictWeightAddition(weightGroups, weightFunction(list(zip(vertex.boneIds.boneIds,vertex.weights.weights))),ix)
-        if "colour" in additionalFields:
-            colour = [vertex.colour for vertex in vertices]
-        flat_vertices = [(vertex.position.x, vertex.position.y, vertex.position.z) for vertex in vertices]
-        normals = [(vertex.normal.x, vertex.normal.y, vertex.normal.z) for vertex in vertices]
-        tangents = [(vertex.tangent.x, vertex.tangent.y, vertex.tangent.z, vertex.tangent.w) for vertex in vertices]
-        uvs = list(map(list, list(zip(*[[(uv.uvX, 1-uv.uvY) for uv in vertex.uvs] for vertex in vertices]))))
-        return flat_vertices, weightGroups, normals, tangents, uvs, colour
-    
-    def traditionalMeshStructure(self, splitWeights):
-        properties = self.Header.externalProperties()
-        faces = [[face.v1, face.v2, face.v3] for face in self.Faces]
-        vertices, weightGroups, normals, tangents, uvs, colour = self.decomposeVertices(self.Vertices, splitWeights)
-        return {"vertices":vertices, "properties":properties, "faces":faces, 
-                "weightGroups":weightGroups, "normals":normals, "tangents":tangents, 
-                "uvs":uvs, "colour":colour}
+        weightFunction = Mod3Mesh.weightFunctionSelector(splitWeights)
+        for ix, (vertexBones, vertexWeights) in enumerate(zip(boneIds.tolist(), weights.tolist())):
+            Mod3Mesh.dictWeightAddition(weightGroups, weightFunction(list(zip(vertexBones,vertexWeights))),ix)
+        return {key:(np.array([ix for ix,_ in group], dtype = np.int64), np.array([weight for _,weight in group]))
+                for key, group in weightGroups.items()}
+    
+    def vertexColumns(self):
+        return Mod3VA.vertexColumns(self.VertexBlock)
+    
+    def meshPartIR(self, splitWeights):
+        columns = self.vertexColumns()
+        meshpart = MeshPartIR(columns["position"], self.Faces.astype(np.int64) - self.Header.vertexSub,
+                              normals = columns["normal"][:,:3], tangents = columns["tangent"], uvs = columns["uvs"],
+                              colours = columns.get("colour"), properties = self.Header.externalProperties())
+        if "weights" in columns:
+            meshpart.weights, _ = Mod3VA.decodeWeights(columns["weights"], columns.get("weightBytes"))
+            meshpart.boneIds = columns["boneIds"]
+            meshpart.weightGroups = self.weightGroups(meshpart.boneIds, meshpart.weights, splitWeights)
+        return meshpart
         
     def faceCount(self):
         return len(self.Faces)
     
     def vertexCount(self):
-        return len(self.Vertices)
+        if self.pending is not None:
+            return self.pending.vertexCount()
+        vertices = self.materializedVertices()
+        return len(self._vertexBlock) if vertices is None else len(vertices)
     
     def vertexBuffer(self):
         return self.Header.blockSize*self.vertexCount()
     
     def faceBuffer(self):
-        return sum([len(face) for face in self.Faces])
+        return self.Faces.size*self.Faces.itemsize
+    
+    def realignFaces(self):
+        if len(self.Faces) and int(self.Faces.max()) + self.Header.vertexSub > 0xFFFF:
+            raise ValueError("Face indices overflow after adding the vertex sub offset")
+        self.Faces = self.Faces + np.uint16(self.Header.vertexSub)
+    
+    def topology(self):
+        if self.Topology is None or self.Topology.faces is not self.Faces:
+            self.Topology = MeshTopology(self.Faces)
+        return self.Topology
     
     def edgeCount(self):
-        return len(set(sum(map(lambda x: x.edges(), self.Faces),[])))
+        return self.topology().edgeCount()
     
     #Len
 
@@ -208,19 +312,35 @@ class Mod3MeshCollection():
         self.vertexOffset = vertexOffset
         self.faceOffset = faceOffset
         
-    def marshall(self, data):
+    def marshall(self, data, lazy = False, meshFilter = None):
+        #meshFilter is a predicate on meshpart headers, rejected parts never read their geometry
         for mesh in self.Meshes:
-            mesh.marshall(data)
+            mesh.marshall(data, lazy = True)
         self.MeshProperties.marshall(data)
+        if meshFilter is not None:
+            self.Meshes = [mesh for mesh in self.Meshes if meshFilter(mesh.Header)]
+        if not lazy:
+            for mesh in self.Meshes:
+                mesh.marshallGeometry()
         
-    def serialize(self):
-        meshes, vertices, faces = [],[],[]
+    def write(self, fileobj, release = False):
+        """Headers, then every vertex buffer, then every face buffer.
+        
+        Each meshpart is encoded as it is written. With release its geometry is dropped right
+        after, so only one encoded vertex buffer is in memory at a time, and the collection
+        can not be written again.
+        """
+        for mesh in self.Meshes:
+            fileobj.write(mesh.Header.serialize())
+        fileobj.write(self.MeshProperties.serialize())
+        for mesh in self.Meshes:
+            fileobj.write(mesh.serializeVertices())
+            if release:
+                mesh.releaseVertices()
         for mesh in self.Meshes:
-            m,v,f = mesh.serialize()
-            meshes.append(m)
-            vertices.append(v)
-            faces.append(f)
-        return b''.join(meshes)+self.MeshProperties.serialize()+b''.join(vertices)+b''.join(faces)
+            fileobj.write(mesh.serializeFaces())
+            if release:
+                mesh.release()
     
     def construct(self, meshparts, meshData):
         for blenMesh,modMesh in zip(meshparts, self.Meshes):
@@ -241,8 +361,7 @@ class Mod3MeshCollection():
     def realignFaces(self):
         #TODO: for each meshpart add vertexsub to each face
         for mesh in self.Meshes:
-            for face in mesh.Faces:
-                face.adjust(mesh.Header.vertexSub)
+            mesh.realignFaces()
     
     def updateCountsOffsets(self):
         #Meshparts
@@ -293,16 +412,11 @@ class Mod3MeshCollection():
     def __iter__(self):
         return self.Meshes.__iter__()
     
-    def traditionalMeshStructure(self, splitWeights=False):
-        tMeshCollection = []
-        for mesh in self.Meshes: 
-            tMesh = mesh.traditionalMeshStructure(splitWeights)
-            tMesh['faces'] = [list(map(lambda x: x-mesh.Header.vertexSub, faceindices)) for faceindices in tMesh['faces']]
-            tMeshCollection.append(tMesh)
-        return tMeshCollection
-    
     def filterLOD(self):
-        self.Meshes = [ mesh for mesh in self.Meshes if mesh.Header.lod == 1 or mesh.Header.lod==0xFFFF ]
+        self.Meshes = [ mesh for mesh in self.Meshes if highestLOD(mesh.Header) ]
+
+def highestLOD(header):
+    return header.lod == 1 or header.lod == 0xFFFF
     
 class Mod3Face(CS.PyCStruct):
     fields = OrderedDict([
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 21:48:16 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+
+class MeshPartIR():
+    """Columnar meshpart exchanged between the mod3 layer and a ModellingAPI.
+
+    positions (N,3) floats, normals (N,3) and tangents (N,4) in the signed byte range of the
+    file, uvs (channels,N,2) in file orientation (v grows downwards), colours (N,4) 0-255,
+    boneIds and weights (N,W) matrices and faces (F,3) vertex indices. Optional columns are
+    None when the meshpart has no such data. properties is the meshpart property dictionary.
+
+    On import weightGroups holds the named vertex groups as {name:(vertexIndices, weights)}.
+    On export bufferedWeights holds the unresolved per vertex BufferedWeights until the
+    blocktype is decided and resolveWeights fills the matrices.
+    """
+    def __init__(self, positions, faces, normals = None, tangents = None, uvs = None,
+                 colours = None, boneIds = None, weights = None, properties = None, name = None):
+        self.positions = np.asarray(positions, dtype = np.float64).reshape(-1,3)
+        self.faces = np.asarray(faces, dtype = np.int64).reshape(-1,3)
+        count = len(self.positions)
+        self.normals = np.zeros((count,3), dtype = np.int64) if normals is None else np.asarray(normals).reshape(-1,3)
+        self.tangents = np.zeros((count,4), dtype = np.int64) if tangents is None else np.asarray(tangents).reshape(-1,4)
+        self.uvs = np.zeros((0,count,2)) if uvs is None else np.asarray(uvs, dtype = np.float64).reshape(len(uvs),count,2)
+        self.colours = None if colours is None else np.asarray(colours).reshape(-1,4)
+        self.boneIds = None if boneIds is None else np.asarray(boneIds, dtype = np.int64)
+        self.weights = None if weights is None else np.asarray(weights, dtype = np.float64)
+        self.properties = {} if properties is None else properties
+        self.name = name
+        self.weightGroups = {}
+        self.bufferedWeights = None
+
+    def vertexCount(self):
+        return len(self.positions)
+
+    def faceCount(self):
+        return len(self.faces)
+
+    def uvCount(self):
+        return len(self.uvs)
+
+    def weightCount(self):
+        return 0 if self.weights is None else self.weights.shape[1]
+
+    def padUVs(self, channels):
+        #Missing channels repeat the first one
+        if self.uvCount() < channels:
+            self.uvs = np.concatenate([self.uvs]+[self.uvs[:1]]*(channels-self.uvCount()))
+
+    def resolveWeights(self, weightClass):
+        if self.bufferedWeights is None:
+            return
+        if weightClass:
+            pairs = np.array([weights.execute(weightClass) for weights in self.bufferedWeights], dtype = np.float64).reshape(-1,weightClass,2)
+            self.boneIds = pairs[:,:,0].astype(np.int64)
+            self.weights = pairs[:,:,1]
+        self.bufferedWeights = None
+
+    def vertexColumns(self):
+        """Columns in the layout Mod3VertexArrays.encodeVertices takes."""
+        columns = {"position":self.positions,
+                   "normal":np.concatenate([self.normals, np.zeros((len(self.normals),1), dtype = self.normals.dtype)], axis = 1),
+                   "tangent":self.tangents,
+                   "uvs":self.uvs}
+        if self.weights is not None:
+            columns["boneIds"] = self.boneIds
+            columns["weights"] = self.weights
+        if self.colours is not None:
+            columns["colour"] = self.colours
+        return columns
@@ -6,15 +6,18 @@ Created on Tue Mar  5 22:29:30 2019
 """
 
 from collections import OrderedDict
+import numpy as np
 try:
     from ..common import Cstruct as CS
-    from ..mod3.Matrices import Matrix
+    from ..mod3.Matrices import Matrix, readMatrices, matricesFromRows, absoluteMatrices, boneDepths
+    from ..mod3.Mod3Topology import csr
 except:
     import sys
     sys.path.insert(0, r'..\common')
     sys.path.insert(0, r'..\mod3')
     import Cstruct as CS
-    from Matrices import Matrix    
+    from Matrices import Matrix, readMatrices, matricesFromRows, absoluteMatrices, boneDepths
+    from Mod3Topology import csr
 
 class Mod3Bone(CS.PyCStruct):
     fields = OrderedDict([
@@ -67,14 +70,145 @@ class Mod3Bone(CS.PyCStruct):
                 "unkn2":self.unkn2,
                 }
         
+
+#Mod3Bone layout as a structured dtype
+boneDtype = np.dtype([("boneFunction","<i2"),
+                      ("parentId","u1"),
+                      ("child","u1"),
+                      ("unkn2","<f4"),
+                      ("length","<f4"),
+                      ("x","<f4"),
+                      ("y","<f4"),
+                      ("z","<f4")])
+
+def bonesFromRecords(bones):
+    #Bone dictionaries into the bone table, keys outside the layout are ignored
+    return np.array([tuple(bone[field] for field in boneDtype.names) for bone in bones], dtype = boneDtype).reshape(-1)
+
+class BoneHierarchy():
+    """Parent/child index of a bone table.
+    
+    parents holds -1 for roots, children are kept in CSR form (childIndptr, childIndices)
+    with one trailing row listing the roots. order lists every bone after its parent.
+    """
+    def __init__(self, parentIds):
+        self.parentIds = np.array(parentIds, dtype = np.int64)
+        count = len(self.parentIds)
+        self.depths = boneDepths(self.parentIds)
+        self.parents = np.where(self.parentIds == 255, -1, self.parentIds)
+        self.order = np.argsort(self.depths, kind = 'stable')
+        rows = np.where(self.parents < 0, count, self.parents)
+        self.childIndptr, self.childIndices = csr(rows, np.arange(count), count+1)
+        
+    def children(self, boneIx):
+        return self.childIndices[self.childIndptr[boneIx]:self.childIndptr[boneIx+1]]
+    
+    def roots(self):
+        return self.children(len(self.parents))
+    
+    def __len__(self):
+        return len(self.parents)
+    
+class Mod3Skeleton():
+    """Bone table as one structured array of boneDtype.
     
-class Mod3Skeleton(CS.Mod3Container):
+    Indexing and iteration hand out numpy records, attribute writes go to the table.
+    """
     def __init__(self, boneCount = 0):
-        super().__init__(Mod3Bone, boneCount)
+        self.bones = np.zeros(boneCount, dtype = boneDtype)
+        self.IK = np.zeros(boneCount, dtype = bool)
+        self.Hierarchy = None
         
-class Mod3Matrices(CS.Mod3Container):
+    def marshall(self, data):
+        count = len(self.bones)
+        self.bones = np.frombuffer(data.read(boneDtype.itemsize*count), dtype = boneDtype, count = count).copy()
+        
+    def construct(self, data):
+        if len(data) != len(self.bones):
+            raise AssertionError("Cannot construct container with different amounts of data")
+        self.bones = data.astype(boneDtype) if isinstance(data, np.ndarray) else bonesFromRecords(data)
+        
+    def serialize(self):
+        return self.bones.tobytes()
+    
+    def hierarchy(self):
+        if self.Hierarchy is None or not np.array_equal(self.Hierarchy.parentIds, self.bones["parentId"]):
+            self.Hierarchy = BoneHierarchy(self.bones["parentId"])
+        return self.Hierarchy
+    
+    def functionIndex(self, slots = 512):
+        return BoneFunctionIndex.fromBoneFunctions(self.bones["boneFunction"], slots)
+    
+    def identifyIK(self):
+        #Aberrant relationship (chained 0s)
+        self.IK = self.bones["length"] == 0
+        return self.IK
+    
+    def __iter__(self):
+        return iter(self.bones.view(np.recarray))
+    
+    def __getitem__(self, ix):
+        return self.bones.view(np.recarray)[ix]
+    
+    def __len__(self):
+        return self.bones.nbytes
+    
+    def append(self, bone):
+        self.bones = np.concatenate([self.bones, bonesFromRecords([bone])])
+    
+    def pop(self, ix):
+        self.bones = np.delete(self.bones, ix)
+        
+    def Count(self):
+        return len(self.bones)
+    
+    def verify(self):
+        if self.bones.dtype != boneDtype:
+            raise AssertionError("Bone table has an illegal layout.")
+        if np.isnan(self.bones["length"]).any() or np.isnan(self.bones["unkn2"]).any():
+            raise AssertionError("Bone table has uninitialized values.")
+        
+class Mod3Matrices():
+    """Bone matrices held as one (boneCount,4,4) float32 array in the file layout (column by column).
+    
+    Indexing and iteration still hand out Matrix objects for per bone code.
+    """
     def __init__(self, boneCount = 0):
-        super().__init__(lambda: Matrix([4,4]), boneCount)
+        self.matrices = np.zeros((boneCount,4,4), dtype = np.float32)
+        
+    def marshall(self, data):
+        self.matrices = readMatrices(data, len(self.matrices))
+        
+    def construct(self, data):
+        if len(data) != len(self.matrices):
+            raise AssertionError("Cannot construct container with different amounts of data")
+        self.matrices = matricesFromRows(data)
+        
+    def serialize(self):
+        return self.matrices.astype('<f4').tobytes()
+    
+    def __iter__(self):
+        return map(Matrix.fromArray, self.matrices)
+    
+    def __getitem__(self, ix):
+        return Matrix.fromArray(self.matrices[ix])
+    
+    def __len__(self):
+        return self.Count()*64
+    
+    def append(self, ele):
+        ele = ele.array() if isinstance(ele, Matrix) else np.asarray(ele, dtype = np.float32)
+        self.matrices = np.concatenate([self.matrices, ele.reshape(1,4,4)])
+    
+    def pop(self, ix):
+        self.matrices = np.delete(self.matrices, ix, axis = 0)
+        
+    def Count(self):
+        return len(self.matrices)
+    
+    def verify(self):
+        if self.matrices.ndim != 3 or self.matrices.shape[1:] != (4,4):
+            raise AssertionError("Matrix has illegal dimensions.")
            
 
 class Mod3MatrixBundle():
@@ -101,6 +235,12 @@ class Mod3MatrixBundle():
     def serialize(self):
         return self.LMatrices.serialize() + self.AMatrices.serialize()
     
+    def absoluteMatrices(self, parentIds):
+        return absoluteMatrices(self.LMatrices.matrices, parentIds)
+    
+    def recalculateAbsolute(self, parentIds):
+        self.AMatrices.matrices = self.absoluteMatrices(parentIds)
+        
     def __getitem__(self, ix):
         return (self.LMatrices[ix], self.AMatrices[ix])
     
@@ -122,15 +262,22 @@ class Mod3SkelletalStructure():
         self.Skeleton = Mod3Skeleton(boneCount)
         self.Matrices = Mod3MatrixBundle(boneCount)
         self.BoneMap = Mod3BoneMap(boneCount, boneMapCount)
+        self.FunctionIndex = None
         
     def marshall(self, data):
         self.Skeleton.marshall(data)
         self.Matrices.marshall(data)
         self.BoneMap.marshall(data)
+        self.FunctionIndex = self.Skeleton.functionIndex(self.BoneMap.boneMapCount)
         
-    def construct(self, skeleton, lmatrices, amatrices):
+    def construct(self, skeleton, lmatrices, amatrices = None):
+        #Without amatrices they are recomputed from the local matrices
         self.Skeleton.construct(skeleton) 
-        self.Matrices.construct(lmatrices, amatrices)
+        if amatrices is None:
+            self.Matrices.LMatrices.construct(lmatrices)
+            self.Matrices.recalculateAbsolute(self.parentIds())
+        else:
+            self.Matrices.construct(lmatrices, amatrices)
         self.foldSkeletonToMap()
     
     def serialize(self):
@@ -141,28 +288,33 @@ class Mod3SkelletalStructure():
         self.Matrices.verify()
         self.BoneMap.verify()
     
+    def parentIds(self):
+        return self.Skeleton.bones["parentId"]
+    
+    def absoluteMatrices(self):
+        """All absolute matrices recomputed from the local ones in one pass down the hierarchy."""
+        return self.Matrices.absoluteMatrices(self.parentIds())
+    
     def identifyIK(self):
-        for ix, bone in enumerate(self.Skeleton):
-            if bone.suspectIK():#Aberrant relationship (chained 0s)
-                bone.markIK()         
+        return self.Skeleton.identifyIK()
     
     def unfoldMapToSkeleton(self):
         families = self.BoneMap.unfold()
-        for bone, function in families:
+        for bone, function in families.items():
             self.Skeleton[bone].boneFunction = function
+        self.FunctionIndex = self.Skeleton.functionIndex(self.BoneMap.boneMapCount)
             
     def foldSkeletonToMap(self):
-        self.BoneMap.fold(self.Skeleton)       
+        self.FunctionIndex = self.Skeleton.functionIndex(self.BoneMap.boneMapCount)
+        self.BoneMap.fold(self.FunctionIndex)       
         
-    def traditionalSkeletonStructure(self):
+    def armatureStructure(self):
+        """Array level skeleton for the modelling api."""
         self.identifyIK()
-
-        return [{**b.coreProperties(),#b.fakeCoreProperties((self.Skeleton[b.parentId] if b.parentId!=255 else None),l,a),#
-                 #AMat[p_x] = LMat[p_x].inverted() * AMat[p_x-1] where p_x is a chain of bones and p_x-1 is p_x parent
-                **{"LMatCol%d"%ix:col for ix,col in enumerate(l.columnRepresentation())},
-                #**{"AMatCol%d"%ix:col for ix,col in enumerate(a.columnRepresentation())},
-                "CustomProperties":{**b.customProperties()}
-                }for b,(l,a) in zip(self.Skeleton, self.Matrices)]    
+        return Mod3Armature(self.Skeleton.bones.copy(), 
+                            self.Matrices.LMatrices.matrices.transpose(0,2,1).astype(np.float64),
+                            self.Skeleton.hierarchy(),
+                            self.FunctionIndex)
                 
     def Count(self):
         return self.Skeleton.Count()
@@ -171,23 +323,87 @@ class Mod3SkelletalStructure():
         return len(self.Skeleton)+len(self.Matrices)+len(self.BoneMap)
 
 
+class Mod3Armature():
+    """Skeleton as handed to the modelling api.
+    
+    bones is the structured bone table, lmatrices the (boneCount,4,4) row major local
+    matrices, hierarchy the BoneHierarchy of the table and functions its BoneFunctionIndex.
+    """
+    def __init__(self, bones, lmatrices, hierarchy, functions):
+        self.bones = bones
+        self.lmatrices = lmatrices
+        self.hierarchy = hierarchy
+        self.functions = functions
+        
+    def customProperties(self, boneIx):
+        bone = self.bones[boneIx]
+        return {"boneFunction":int(bone["boneFunction"]),
+                "child":int(bone["child"]),
+                "unkn2":float(bone["unkn2"]),
+                }
+        
+    def __len__(self):
+        return len(self.bones)
+
+class BoneFunctionIndex():
+    """Bidirectional boneFunction <-> bone index lookup over two fixed arrays.
+    
+    functionBones has one entry per bone map slot (255 when no bone has the function),
+    boneFunctions one per bone (512 when the bone has none).
+    """
+    def __init__(self, functionBones, boneFunctions):
+        self.functionBones = functionBones
+        self.boneFunctions = boneFunctions
+        
+    @classmethod
+    def fromBoneFunctions(cls, boneFunctions, slots = 512):
+        #A function claimed by several bones resolves to the last of them, as folding always did
+        boneFunctions = np.array(boneFunctions, dtype = np.int64)
+        functionBones = np.full(slots, 255, dtype = np.int64)
+        assigned = np.flatnonzero((boneFunctions >= 0) & (boneFunctions < slots))[::-1]
+        functions, last = np.unique(boneFunctions[assigned], return_index = True)
+        functionBones[functions] = assigned[last]
+        return cls(functionBones, boneFunctions)
+    
+    @classmethod
+    def fromBoneMap(cls, boneMap, boneCount):
+        #A bone mapped by several functions keeps the lowest of them
+        functionBones = np.array(boneMap, dtype = np.int64)
+        boneFunctions = np.full(boneCount, 512, dtype = np.int64)
+        mapped = np.flatnonzero(functionBones < boneCount)
+        bones, first = np.unique(functionBones[mapped], return_index = True)
+        boneFunctions[bones] = mapped[first]
+        return cls(functionBones, boneFunctions)
+    
+    def bone(self, function, default = 255):
+        if 0 <= function < len(self.functionBones):
+            return int(self.functionBones[function])
+        return default
+    
+    def function(self, boneIx, default = 512):
+        if 0 <= boneIx < len(self.boneFunctions):
+            return int(self.boneFunctions[boneIx])
+        return default
+    
+    def __len__(self):
+        return len(self.boneFunctions)
+
 class Mod3BoneMap(CS.PyCStruct):
     boneMapCount = 512
     def __init__(self,boneCount, boneMapCount):
+        self.boneCount = boneCount
         self.boneMapCount = Mod3BoneMap.boneMapCount*(boneCount!=0)
         self.fields = OrderedDict([('boneMap','ubyte[%d]'%self.boneMapCount)])
         super().__init__()
     
     def unfold(self):#Bone map to dictionary of bones with their "animation position"
-        boneProperties = {}
-        for entryNum, mapping in enumerate(self.boneMap):
-            if mapping not in boneProperties:
-                boneProperties[mapping]=entryNum
-            else:
-                raise ValueError("Bone %d has multiple functions assigned by the BoneMap."%mapping)
+        mapping = np.array(self.boneMap, dtype = np.int64)
+        mapping = mapping[mapping != 255]
+        repeated = np.flatnonzero(np.bincount(mapping) > 1) if len(mapping) else mapping
+        if len(repeated):
+            raise ValueError("Bone %d has multiple functions assigned by the BoneMap."%repeated[0])
+        index = BoneFunctionIndex.fromBoneMap(self.boneMap, self.boneCount)
+        return {bone:function for bone, function in enumerate(index.boneFunctions.tolist()) if function != 512}
             
-    def fold(self, skeleton):#skeleton with custom property to bonemap)
-        self.boneMap = [255]*self.boneMapCount
-        for bIndex, bone in enumerate(skeleton):
-            if not bone.boneFunction == 512:
-                self.boneMap[bone.boneFunction] = bIndex
\ No newline at end of file
+    def fold(self, functionIndex):#BoneFunctionIndex of the skeleton to bonemap
+        self.boneMap = functionIndex.functionBones.tolist()
@@ -12,7 +12,7 @@ import sys
 sys.path.insert(0, r'..\common')
 sys.path.insert(0, r'..\mod3')
 sys.path.insert(0, r'..\mrl3')
-from Matrices import Matrix
+from Matrices import Matrix, invertMatrices, composeMatrices, absoluteMatrices
 from Mod3VertexBuffers import Mod3Vertex
 
 class progbar():
@@ -33,11 +33,13 @@ class progbar():
 
 def getAbsoluteMatrix(Skeleton, Matriz, boneIx):
     parentId = Skeleton[boneIx].parentId
+    inverse = invertMatrices(Matriz.LMatrices.matrices[boneIx])
     if parentId == 255:
-        parentMatrix = Matrix((4,4),identity=True)
-    else:
-        parentMatrix = Matriz[parentId][1]
-    return Matriz[boneIx][0].invert()*parentMatrix
+        return Matrix.fromArray(inverse)
+    return Matrix.fromArray(composeMatrices(inverse, Matriz.AMatrices.matrices[parentId]))
+
+def getAbsoluteMatrices(Skeleton, Matriz):
+    return absoluteMatrices(Matriz.LMatrices.matrices, [bone.parentId for bone in Skeleton])
     
     """
     if boneIx in World:
@@ -71,7 +73,7 @@ for file in filelist:
     binaryData = fileHandle.read()
     fileHandle.close()
     pseudofile = FileLike(binaryData)
-    model = Mod3.Mod3()
+    model = Mod3.LazyMod3()
     model.marshall(pseudofile)
     for ix, mesh in enumerate(model.MeshParts):
         blocktypeListing[Mod3Vertex.blocklist[mesh.Header.blocktype]["name"]].add(file)
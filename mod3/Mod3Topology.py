@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:40:02 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+
+def csr(keys, values, rowCount):
+    #Groups values by key into (indptr, indices) compressed rows
+    order = np.argsort(keys, kind = 'stable')
+    indptr = np.zeros(rowCount+1, dtype = np.int64)
+    np.cumsum(np.bincount(keys, minlength = rowCount), out = indptr[1:])
+    return indptr, values[order]
+
+class MeshTopology():
+    """Edge and adjacency index of a triangle list.
+
+    Edges are the unique sorted vertex pairs packed as (low << 16 | high) uint32 keys.
+    faceEdges maps every face corner (v1v2, v2v3, v3v1) to its edge index. Vertex to face
+    and edge to face adjacency are kept in CSR form (indptr, indices).
+    """
+    def __init__(self, faces):
+        self.faces = faces
+        faces = np.asarray(faces, dtype = np.int64).reshape(-1,3)
+        faceIndices = np.arange(len(faces))
+        start, end = faces.ravel(), faces[:,[1,2,0]].ravel()
+        keys = (np.minimum(start,end) << 16 | np.maximum(start,end)).astype(np.uint32)
+        self.edgeKeys, edgeIndices = np.unique(keys, return_inverse = True)
+        self.edges = np.stack([self.edgeKeys >> 16, self.edgeKeys & 0xFFFF], axis = 1)
+        self.faceEdges = edgeIndices.reshape(-1,3)
+        cornerFaces = np.repeat(faceIndices, 3)
+        self.edgeFaceIndptr, self.edgeFaceIndices = csr(edgeIndices.ravel(), cornerFaces, len(self.edgeKeys))
+        vertexCount = int(faces.max())+1 if len(faces) else 0
+        self.vertexFaceIndptr, self.vertexFaceIndices = csr(start, cornerFaces, vertexCount)
+
+    def edgeCount(self):
+        return len(self.edgeKeys)
+
+    def edgeIndex(self, v1, v2):
+        key = min(v1,v2) << 16 | max(v1,v2)
+        ix = int(np.searchsorted(self.edgeKeys, key))
+        if ix == len(self.edgeKeys) or self.edgeKeys[ix] != key:
+            raise KeyError("(%d,%d) is not an edge of the mesh"%(v1,v2))
+        return ix
+
+    def edgeFaces(self, edgeIx):
+        return self.edgeFaceIndices[self.edgeFaceIndptr[edgeIx]:self.edgeFaceIndptr[edgeIx+1]]
+
+    def vertexFaces(self, vertexIx):
+        if vertexIx+1 >= len(self.vertexFaceIndptr):
+            return self.vertexFaceIndices[:0]
+        return self.vertexFaceIndices[self.vertexFaceIndptr[vertexIx]:self.vertexFaceIndptr[vertexIx+1]]
+
+    def edgeValence(self):
+        return np.diff(self.edgeFaceIndptr)
+
+    def boundaryEdges(self):
+        return np.flatnonzero(self.edgeValence() == 1)
+
+    def nonManifoldEdges(self):
+        return np.flatnonzero(self.edgeValence() > 2)
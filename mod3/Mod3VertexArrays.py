@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 10:12:44 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+try:
+    from ..mod3.Mod3VertexBuffers import Mod3Vertex, Mod3VertexWeightBase, Mod3VertexWeightExtended
+    from ..common.FileLike import FileLike
+    from ..common.Cstruct import decodeHalf, encodeHalf
+except:
+    import sys
+    sys.path.insert(0, r'..\mod3')
+    sys.path.insert(0, r'..\common')
+    from Mod3VertexBuffers import Mod3Vertex, Mod3VertexWeightBase, Mod3VertexWeightExtended
+    from FileLike import FileLike
+    from Cstruct import decodeHalf, encodeHalf
+
+#Blocktype -> structured dtype matching the Mod3Vertex field layout
+blockDtypes = {}
+
+def blockDtype(blocktype):
+    if blocktype not in blockDtypes:
+        block = Mod3Vertex.blocklist[blocktype]
+        fields = [("position","<f4",(3,)),
+                  ("normal","i1",(4,)),
+                  ("tangent","i1",(4,)),
+                  ("uvs","<u2",(block["uvs"],2))]
+        if "weights" in block:
+            fields.append(("weights","<u4"))
+            if block["weights"] == 8:
+                fields.append(("weightBytes","u1",(4,)))
+            fields.append(("boneIds","u1",(block["weights"],)))
+        if "colour" in block:
+            fields.append(("colour","u1",(4,)))
+        blockDtypes[blocktype] = np.dtype(fields)
+    return blockDtypes[blocktype]
+
+def readVertexBlock(data, blocktype, vertexCount):
+    """Reads vertexCount vertices at the current position as one structured array."""
+    dtype = blockDtype(blocktype)
+    return np.frombuffer(data.read(dtype.itemsize*vertexCount), dtype = dtype, count = vertexCount).copy()
+
+def blockFromVertices(vertices, blocktype):
+    return np.frombuffer(b''.join([vertex.serialize() for vertex in vertices]), dtype = blockDtype(blocktype)).copy()
+
+def vertexColumns(vertexBlock):
+    names = vertexBlock.dtype.names
+    columns = {"position":vertexBlock["position"].astype(np.float64),
+               "normal":vertexBlock["normal"].astype(np.int32),
+               "tangent":vertexBlock["tangent"].astype(np.int32),
+               "uvs":decodeHalf(vertexBlock["uvs"]).transpose(1,0,2)}
+    if "weights" in names:
+        columns["weights"] = vertexBlock["weights"].copy()
+        columns["boneIds"] = vertexBlock["boneIds"].astype(np.int32)
+    if "weightBytes" in names:
+        columns["weightBytes"] = vertexBlock["weightBytes"].copy()
+    if "colour" in names:
+        columns["colour"] = vertexBlock["colour"].copy()
+    return columns
+
+def decodeVertices(data, blocktype, vertexCount):
+    """Decodes a meshpart vertex block into column arrays.
+
+    position (N,3), normal and tangent (N,4), uvs (channels,N,2), packed weights (N,)
+    and weightBytes (N,4) for 8 weight blocktypes, boneIds (N,weights), colour (N,4).
+    """
+    return vertexColumns(readVertexBlock(data, blocktype, vertexCount))
+
+def encodeVertices(columns, blocktype):
+    """Builds the vertex block for a blocktype from column arrays in a single pass.
+
+    Takes the decodeVertices columns except that weights are the (N,weights) unpacked
+    weight matrix, with an optional (N,) "bits" column holding the top 2 weight bits.
+    """
+    block = Mod3Vertex.blocklist[blocktype]
+    vertexBlock = np.zeros(len(columns["position"]), dtype = blockDtype(blocktype))
+    vertexBlock["position"] = columns["position"]
+    vertexBlock["normal"] = columns["normal"]
+    vertexBlock["tangent"] = columns["tangent"]
+    vertexBlock["uvs"] = encodeHalf(np.asarray(columns["uvs"])[:block["uvs"]]).transpose(1,0,2)
+    if "weights" in block:
+        tenBitWeights, weightBytes = encodeWeights(columns["weights"], columns.get("bits"))
+        vertexBlock["weights"] = tenBitWeights
+        if block["weights"] == 8:
+            vertexBlock["weightBytes"] = weightBytes
+        vertexBlock["boneIds"] = columns["boneIds"]
+    if "colour" in block:
+        vertexBlock["colour"] = columns["colour"]
+    return vertexBlock
+
+TEN_BIT_SHIFTS = np.array([0,10,20])
+
+def decodeWeights(tenBitWeights, weightBytes = None):
+    """Unpacks a meshpart's weight words into an (N,4) or (N,8) weight matrix.
+
+    The last weight of every vertex is the implied complement of the others.
+    weightBytes holds the extra ubyte[4] of 8 weight blocktypes. Also returns the
+    top 2 bits of every word.
+    """
+    tenBitWeights = np.asarray(tenBitWeights, dtype = np.uint32).astype(np.int64)
+    tenBitParts = (tenBitWeights[:,None] >> TEN_BIT_SHIFTS) & 0x3ff
+    bits = (tenBitWeights >> 30).astype(np.uint8)
+    if weightBytes is None:
+        parts = np.concatenate([tenBitParts, Mod3VertexWeightBase.WEIGHT_MULTIPLIER - tenBitParts.sum(axis = 1)[:,None]], axis = 1)
+        return parts/Mod3VertexWeightBase.WEIGHT_MULTIPLIER, bits
+    weights = np.empty((len(tenBitWeights),8))
+    weights[:,:3] = tenBitParts/Mod3VertexWeightBase.WEIGHT_MULTIPLIER
+    weights[:,3:7] = np.asarray(weightBytes)/Mod3VertexWeightExtended.WEIGHT_MULTIPLIER
+    weights[:,7] = 1.0 - weights[:,:7].sum(axis = 1)
+    return weights, bits
+
+def encodeWeights(weights, bits = None):
+    """Packs an (N,4) or (N,8) weight matrix into weight words and, for 8 weights, the extra bytes.
+
+    The last weight is implied and not stored. bits are the top 2 bits to keep per vertex.
+    """
+    weights = np.asarray(weights, dtype = np.float64)
+    bits = np.zeros(len(weights), dtype = np.int64) if bits is None else np.asarray(bits, dtype = np.int64)
+    tenBitParts = np.rint(weights[:,:3]*Mod3VertexWeightBase.WEIGHT_MULTIPLIER).astype(np.int64)
+    tenBitWeights = ((tenBitParts << TEN_BIT_SHIFTS).sum(axis = 1) + (bits << 30)).astype(np.uint32)
+    weightBytes = None
+    if weights.shape[1] == 8:
+        weightBytes = np.rint(weights[:,3:7]*Mod3VertexWeightExtended.WEIGHT_MULTIPLIER).astype(np.uint8)
+    return tenBitWeights, weightBytes
+
+def vertexObjects(vertexBlock, blocktype):
+    #Materializes Mod3Vertex instances for code that still walks vertices one by one
+    data = FileLike(vertexBlock.tobytes())
+    vertices = [Mod3Vertex(blocktype) for _ in range(len(vertexBlock))]
+    for vertex in vertices:
+        vertex.marshall(data)
+    return vertices
@@ -30,6 +30,7 @@ class ModellingAPI():
         raise NotImplemented
         
     def createMeshParts(self, meshPartList, c):
+        #meshPartList holds Mod3MeshIR.MeshPartIR instances
         raise NotImplemented
         
     def importTextures(self, importerFunction, c):
@@ -45,6 +46,7 @@ class ModellingAPI():
         raise NotImplemented
         
     def getMeshparts(self, options):
+        #Returns a list of Mod3MeshIR.MeshPartIR with bufferedWeights pending and the material list
         raise NotImplemented
         
     def overrideMeshDefaults(self, c):
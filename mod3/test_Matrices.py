@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 00:52:19 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+import pytest
+
+import Matrices
+from Matrices import Matrix
+from FileLike import FileLike
+
+#The per element Matrix arithmetic the batched functions replace, on column lists
+def naiveMul(a, b):
+    c = [[0]*len(a[0]) for _ in range(len(b))]
+    for row in range(len(a[0])):
+        for column in range(len(b)):
+            c[column][row] = sum([a[iteration][row]*b[column][iteration] for iteration in range(len(a[0]))])
+    return c
+
+def naiveDeterminant(m):
+    if len(m) == 2:
+        return m[0][0]*m[1][1]-m[0][1]*m[1][0]
+    return sum([((-1)**c)*m[0][c]*naiveDeterminant(Matrix.getMinor(m,0,c)) for c in range(len(m))])
+
+def naiveInverse(m):
+    determinant = naiveDeterminant(m)
+    cofactors = [[((-1)**(r+c))*naiveDeterminant(Matrix.getMinor(m,r,c)) for c in range(len(m))] for r in range(len(m))]
+    return [[value/determinant for value in row] for row in Matrix.transposeMatrix(cofactors)]
+
+def naiveAbsolute(lmatrices, parentIds):
+    absolute = {}
+    def resolve(bone):
+        if bone not in absolute:
+            inverse = naiveInverse(lmatrices[bone])
+            parent = parentIds[bone]
+            absolute[bone] = inverse if parent == 255 else naiveMul(inverse, resolve(parent))
+        return absolute[bone]
+    return [resolve(bone) for bone in range(len(lmatrices))]
+
+def randomMatrices(count, seed = 0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(-1, 1, (count,4,4)) + 2*np.eye(4)).astype(np.float32)
+
+def test_readMatricesMatchesMatrixMarshall():
+    matrices = randomMatrices(5)
+    data = matrices.astype('<f4').tobytes()
+    assert np.array_equal(Matrices.readMatrices(FileLike(data), 5), matrices)
+    source = FileLike(data)
+    for matrix in matrices:
+        assert Matrix((4,4), source).matrix == matrix.tolist()
+    assert b''.join([Matrix.fromArray(matrix).serialize() for matrix in matrices]) == data
+
+def test_matricesFromRowsTransposesToFileLayout():
+    rows = randomMatrices(3, 1).astype(np.float64)
+    fileLayout = Matrices.matricesFromRows(rows.tolist())
+    for matrix, row in zip(fileLayout, rows):
+        construct = Matrix((4,4))
+        construct.construct(row.tolist())
+        assert np.array_equal(matrix, np.array(construct.matrix, dtype = np.float32))
+
+def test_batchedProductsAndInversesMatchNaive():
+    a, b = randomMatrices(4, 2).astype(np.float64), randomMatrices(4, 3).astype(np.float64)
+    composed = Matrices.composeMatrices(a, b)
+    inverted = Matrices.invertMatrices(a)
+    for ix in range(4):
+        assert np.allclose(composed[ix], naiveMul(a[ix].tolist(), b[ix].tolist()))
+        assert np.allclose(inverted[ix], naiveInverse(a[ix].tolist()))
+
+def test_absoluteMatricesMatchPerBoneRecursion():
+    parentIds = [255, 0, 1, 1, 255, 4, 2, 6]
+    lmatrices = randomMatrices(len(parentIds), 4)
+    expected = naiveAbsolute([matrix.astype(np.float64).tolist() for matrix in lmatrices], parentIds)
+    absolute = Matrices.absoluteMatrices(lmatrices, parentIds)
+    assert absolute.dtype == np.float32
+    assert np.allclose(absolute, expected, atol = 1e-5)
+
+def test_boneDepths():
+    assert Matrices.boneDepths([255, 0, 1, 1, 255, 4]).tolist() == [0, 1, 2, 2, 0, 1]
+    with pytest.raises(ValueError):
+        Matrices.boneDepths([255, 2, 1])
+    with pytest.raises(ValueError):
+        Matrices.boneDepths([255, 7])
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:52:30 2026
+
+@author: AsteriskAmpersand
+"""
+import io
+import numpy as np
+import pytest
+
+import Mod3
+from Mod3MeshIR import MeshPartIR
+from Mod3VertexBuffers import Mod3Vertex
+from FileLike import FileLike, MappedFileLike
+
+def meshpart(rng, index, blocktype, boneCount, vertexCount = 20, faceCount = 16):
+    block = Mod3Vertex.blocklist[blocktype]
+    boneIds = weights = colours = None
+    if "weights" in block:
+        weights = rng.integers(1, 40, (vertexCount, block["weights"])).astype(np.float64)
+        weights /= weights.sum(axis = 1)[:,None]
+        boneIds = rng.integers(0, max(boneCount, 1), (vertexCount, block["weights"]))
+    if "colour" in block:
+        colours = rng.integers(0, 256, (vertexCount, 4))
+    properties = {"unkn":1, "visibleCondition":2, "lod":[1,0xFFFF,2,4][index%4], "unkn2":3, "unkn3":4,
+                  "blocktype":blocktype, "boneremapid":5, "unkn9":[0]*39, "materialIdx":index%2}
+    return MeshPartIR(rng.uniform(-100, 100, (vertexCount,3)), rng.integers(0, vertexCount, (faceCount,3)),
+                      normals = rng.integers(-127, 128, (vertexCount,3)), tangents = rng.integers(-127, 128, (vertexCount,4)),
+                      uvs = rng.uniform(-2, 2, (block["uvs"],vertexCount,2)), colours = colours,
+                      boneIds = boneIds, weights = weights, properties = properties, name = "part%d"%index)
+
+def syntheticModel(seed = 0, boneCount = 6):
+    #Small model with one meshpart per blocktype
+    rng = np.random.default_rng(seed)
+    skeleton = [{"boneFunction":ix*3, "parentId":255 if ix == 0 else int(rng.integers(0, ix)), "child":255,
+                 "unkn2":0.5, "length":float(ix), "x":0.25, "y":-0.5, "z":float(ix)} for ix in range(boneCount)]
+    lmatrices = rng.uniform(-1, 1, (boneCount,4,4)).tolist()
+    amatrices = rng.uniform(-1, 1, (boneCount,4,4)).tolist()
+    meshparts = [meshpart(rng, ix, blocktype, boneCount) for ix, blocktype in enumerate(sorted(Mod3Vertex.blocklist))]
+    header = {"vertexIds":0, "groupCount":2, "boneMapCount":boneCount, "materialCount":2,
+              "hUnkn1":[float(ix) for ix in range(38)], "hUnkn2":list(range(64))}
+    model = Mod3.Mod3()
+    model.construct(header, [{"materialName":"mat_a"},{"materialName":"mat_b"}], list(range(16)),
+                    skeleton, lmatrices, amatrices, meshparts, [list(range(36))], [1,2,3,4,5])
+    return model, meshparts
+
+def reread(serialization, source = FileLike):
+    model = Mod3.Mod3()
+    model.marshall(source(serialization))
+    return model
+
+def test_readWriteIdentity():
+    serialization = syntheticModel()[0].serialize()
+    assert reread(serialization).serialize() == serialization
+    assert reread(serialization, MappedFileLike).serialize() == serialization
+
+def test_serializeLeavesModelIntact():
+    model = syntheticModel()[0]
+    serialization = model.serialize()
+    assert model.serialize() == serialization
+    marshalled = reread(serialization)
+    assert marshalled.serialize() == marshalled.serialize() == serialization
+
+def test_releasingWriteDropsGeometry():
+    model = syntheticModel()[0]
+    serialization = model.serialize()
+    released = io.BytesIO()
+    model.write(released, release = True)
+    assert released.getvalue() == serialization
+    assert all(mesh.pending is None and mesh.VertexBlock is None for mesh in model.MeshParts.Meshes)
+
+def test_editedVerticesAreWritten():
+    model = reread(syntheticModel()[0].serialize())
+    mesh = model.MeshParts.Meshes[0]
+    mesh.Vertices[3].position.x = 12.5
+    assert mesh.VertexBlock["position"][3,0] == 12.5
+    reimported = reread(model.serialize()).MeshParts.Meshes[0]
+    assert reimported.VertexBlock["position"][3,0] == 12.5
+    assert np.array_equal(reimported.VertexBlock, mesh.VertexBlock)
+    assert next(model.prepareMeshparts(0)).positions[3,0] == 12.5
+
+def test_bonelessReadWriteIdentity():
+    model = syntheticModel(boneCount = 0)[0]
+    assert model.Header.boneOffset == 0
+    serialization = model.serialize()
+    assert reread(serialization).serialize() == serialization
+
+def test_readBackMatchesConstructedMeshparts():
+    model, meshparts = syntheticModel()
+    serialization = model.serialize()
+    model = reread(serialization)
+    for expected, imported in zip(meshparts, model.prepareMeshparts(0)):
+        assert np.array_equal(imported.positions, expected.positions.astype(np.float32))
+        assert np.array_equal(imported.faces, expected.faces)
+        assert np.array_equal(imported.normals, expected.normals)
+        assert np.array_equal(imported.uvs, expected.uvs.astype(np.float16))
+        if expected.colours is not None:
+            assert np.array_equal(imported.colours, expected.colours)
+    assert model.MeshParts.Count() == len(meshparts)
+    assert model.serialize() == serialization
+
+def test_releasingImportKeepsMeshpartHeaders():
+    model, meshparts = syntheticModel()
+    model = reread(model.serialize())
+    properties = model.meshProperties()
+    imported = [meshpart.name for meshpart in model.prepareMeshparts(0, release = True)]
+    assert len(imported) == model.MeshParts.Count() == len(meshparts)
+    assert all(mesh.VertexBlock is None and not len(mesh.Faces) for mesh in model.MeshParts.Meshes)
+    assert model.meshProperties() == properties
+
+def test_lazyReadWriteIdentity():
+    serialization = syntheticModel()[0].serialize()
+    lazy = Mod3.LazyMod3()
+    lazy.marshall(MappedFileLike(serialization))
+    assert "Skeleton" not in lazy.__dict__ and "Materials" not in lazy.__dict__
+    assert lazy.serialize() == serialization
+    model = Mod3.Mod3()
+    model.marshall(MappedFileLike(serialization), lazyGeometry = True)
+    assert all(mesh.source is not None for mesh in model.MeshParts.Meshes)
+    assert model.serialize() == serialization
+
+def test_readMeshPartMatchesFullRead(tmp_path):
+    serialization = syntheticModel()[0].serialize()
+    path = str(tmp_path/"model.mod3")
+    with open(path, "wb") as modelFile:
+        modelFile.write(serialization)
+    model = reread(serialization)
+    for index, mesh in enumerate(model.MeshParts.Meshes):
+        single = Mod3.readMeshPart(path, index)
+        assert single.VertexBlock.tobytes() == mesh.VertexBlock.tobytes()
+        assert np.array_equal(single.Faces, mesh.Faces)
+    with pytest.raises(IndexError):
+        Mod3.readMeshPart(path, len(model.MeshParts.Meshes))
+
+def test_lazyGeometryAfterCloseRaises():
+    source = MappedFileLike(syntheticModel()[0].serialize())
+    model = Mod3.Mod3()
+    model.marshall(source, lazyGeometry = True)
+    source.close()
+    with pytest.raises(ValueError):
+        model.MeshParts.Meshes[0].VertexBlock
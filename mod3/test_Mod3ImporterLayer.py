@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:05:12 2026
+
+@author: AsteriskAmpersand
+"""
+import os
+import struct
+
+import Mod3ImporterLayer
+import Mod3Components
+import TextureConverter
+from DDSDecoder import ddsHeader
+
+class StubMaterialCache():
+    def __init__(self, textures):
+        self.textures = textures
+    def load(self, path):
+        return self.textures
+
+class StubApi():
+    def __init__(self):
+        self.fetched = {}
+    def importTextures(self, textureFetch, c):
+        for name in ("skin", "eye", "missing"):
+            try:
+                self.fetched[name] = textureFetch(name)
+            except KeyError:
+                pass
+
+class StubContext():
+    def __init__(self, path):
+        self.path = path
+
+def writeTex(path, formatId):
+    header = bytearray(0xB8)
+    header[:4] = b"TEX\x00"
+    struct.pack_into("<5I", header, 0x10, 1, 4, 4, 1, formatId)
+    with open(path, "wb") as texFile:
+        texFile.write(bytes(header) + struct.pack("<Q", 0xC0) + bytes(16))
+
+def stubConverter(extension, path, outputFolder):
+    with open(os.path.join(outputFolder, os.path.splitext(os.path.basename(path))[0]+".png"), "wb") as png:
+        png.write(b"png")
+    return True
+
+def importer(tmp_path, monkeypatch, converter):
+    materials = Mod3Components.Mod3Materials(3)
+    materials.construct([{"materialName":name} for name in ("skin\x00", "eye", "missing")])
+    model = type("Model", (), {"Materials":materials})()
+    layer = Mod3ImporterLayer.Mod3ToModel.__new__(Mod3ToModel)
+    layer.model, layer.api = model, StubApi()
+    monkeypatch.setattr(Mod3ImporterLayer.Mrl3, "materialCache", StubMaterialCache({"skin":"pl\\skin_BML", "eye":"eye_BML"}))
+    monkeypatch.setattr(Mod3ImporterLayer, "textureCache", TextureConverter.TextureCache(str(tmp_path/"cache")))
+    monkeypatch.setattr(TextureConverter, "runConverter", converter)
+    with open(tmp_path/"skin_BML.dds", "wb") as ddsFile:
+        ddsFile.write(ddsHeader("BC1", 4, 4, 1) + bytes(8))
+    writeTex(str(tmp_path/"eye_BML.tex"), 28)
+    layer.importTextures(StubContext(str(tmp_path/"model.mod3")), None)
+    return layer.api.fetched
+
+Mod3ToModel = Mod3ImporterLayer.Mod3ToModel
+
+def test_importTexturesResolvesMaterialNames(tmp_path, monkeypatch):
+    fetched = importer(tmp_path, monkeypatch, lambda *args: False)
+    assert fetched == {"skin":str(tmp_path/"skin_BML.dds")}
+
+def test_importTexturesConvertsUndecodableFormats(tmp_path, monkeypatch):
+    fetched = importer(tmp_path, monkeypatch, stubConverter)
+    assert fetched["skin"] == str(tmp_path/"skin_BML.dds")
+    assert fetched["eye"].startswith(str(tmp_path/"cache"))
+    assert fetched["eye"].endswith("eye_BML.png") and os.path.exists(fetched["eye"])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 01:03:44 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+
+import Mod3Skeleton as Mod3S
+from FileLike import FileLike, MappedFileLike
+
+parentIds = [255, 0, 1, 1, 255, 4, 2, 0]
+
+def boneRecords():
+    return [{"boneFunction":[0,1,2,3,40,41,512,7][ix], "parentId":parent, "child":255 if ix%2 else ix+1,
+             "unkn2":0.5*ix, "length":0.0 if ix == 3 else 1.0+ix, "x":ix, "y":-ix, "z":0.25, "extra":None}
+            for ix, parent in enumerate(parentIds)]
+
+def test_boneTableMatchesBoneStructs():
+    records = boneRecords()
+    skeleton = Mod3S.Mod3Skeleton(len(records))
+    skeleton.construct(records)
+    serialization = skeleton.serialize()
+    assert serialization == b''.join([Mod3S.Mod3Bone(**{field:record[field] for field in Mod3S.Mod3Bone.fields}).serialize()
+                                      for record in records])
+    assert len(skeleton) == len(serialization) == len(records)*Mod3S.boneDtype.itemsize
+    for source in (FileLike(serialization), MappedFileLike(serialization)):
+        reread = Mod3S.Mod3Skeleton(len(records))
+        reread.marshall(source)
+        assert reread.serialize() == serialization
+    bone = Mod3S.Mod3Bone(FileLike(serialization[Mod3S.boneDtype.itemsize:]))
+    assert (bone.boneFunction, bone.parentId, bone.length) == (skeleton[1].boneFunction, skeleton[1].parentId, skeleton[1].length)
+    assert skeleton.identifyIK().tolist() == [ix == 3 for ix in range(len(records))]
+
+def test_hierarchyMatchesParentScan():
+    hierarchy = Mod3S.BoneHierarchy(parentIds)
+    for bone in range(len(parentIds)):
+        assert hierarchy.children(bone).tolist() == [child for child, parent in enumerate(parentIds) if parent == bone]
+    assert hierarchy.roots().tolist() == [0, 4]
+    position = {bone:ix for ix, bone in enumerate(hierarchy.order.tolist())}
+    assert all(position[parent] < position[bone] for bone, parent in enumerate(parentIds) if parent != 255)
+
+def test_skeletalStructureRoundTrips():
+    records = boneRecords()
+    rng = np.random.default_rng(0)
+    lmatrices = (rng.uniform(-1, 1, (len(records),4,4)) + 2*np.eye(4)).tolist()
+    structure = Mod3S.Mod3SkelletalStructure(len(records), None)
+    structure.construct(records, lmatrices)
+    serialization = structure.serialize()
+    assert len(serialization) == len(structure)
+    reread = Mod3S.Mod3SkelletalStructure(len(records), 512)
+    reread.marshall(FileLike(serialization))
+    assert reread.serialize() == serialization
+    assert np.allclose(reread.Matrices.AMatrices.matrices, structure.absoluteMatrices())
+
+def test_functionIndexMatchesLegacyFold():
+    functions = [0, 1, 2, 3, 40, 2, 512, 7]
+    index = Mod3S.BoneFunctionIndex.fromBoneFunctions(functions)
+    boneMap = [255]*512
+    for bone, function in enumerate(functions):
+        if function != 512:
+            boneMap[function] = bone
+    assert index.functionBones.tolist() == boneMap
+    assert [index.function(bone) for bone in range(len(functions))] == functions
+    assert (index.bone(2), index.bone(40), index.bone(5), index.bone(600)) == (5, 4, 255, 255)
+    assert index.function(len(functions)) == 512
+
+def test_boneMapFoldsAndUnfolds():
+    records = boneRecords()
+    rng = np.random.default_rng(1)
+    structure = Mod3S.Mod3SkelletalStructure(len(records), None)
+    structure.construct(records, (rng.uniform(-1, 1, (len(records),4,4)) + 2*np.eye(4)).tolist())
+    boneMap = structure.BoneMap.boneMap
+    assert len(boneMap) == 512
+    assert {function:bone for function, bone in enumerate(boneMap) if bone != 255} == \
+        {record["boneFunction"]:bone for bone, record in enumerate(records) if record["boneFunction"] != 512}
+    assert structure.BoneMap.unfold() == {bone:record["boneFunction"] for bone, record in enumerate(records) if record["boneFunction"] != 512}
+    structure.Skeleton.bones["boneFunction"] = 0
+    structure.unfoldMapToSkeleton()
+    assert structure.Skeleton.bones["boneFunction"].tolist() == [0,1,2,3,40,41,0,7]
+    assert structure.FunctionIndex.bone(41) == 5
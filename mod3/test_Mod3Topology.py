@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 00:06:51 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+import pytest
+
+from Mod3Topology import MeshTopology
+
+def randomFaces(seed = 0, vertexCount = 40, faceCount = 120):
+    rng = np.random.default_rng(seed)
+    faces = rng.integers(0, vertexCount, (faceCount,3))
+    faces[:4] = [[0,1,2],[2,1,0],[3,3,4],[1,2,5]]
+    return faces
+
+def bruteForce(faces):
+    edgeFaces = {}
+    for face, (v1, v2, v3) in enumerate(faces.tolist()):
+        for start, end in ((v1,v2),(v2,v3),(v3,v1)):
+            edgeFaces.setdefault((min(start,end),max(start,end)), []).append(face)
+    return edgeFaces
+
+def test_edgesMatchBruteForce():
+    faces = randomFaces()
+    topology = MeshTopology(faces)
+    edgeFaces = bruteForce(faces)
+    assert [tuple(edge) for edge in topology.edges.tolist()] == sorted(edgeFaces)
+    assert topology.edgeCount() == len(edgeFaces)
+    for edge, adjacent in edgeFaces.items():
+        ix = topology.edgeIndex(*edge)
+        assert topology.edgeIndex(*reversed(edge)) == ix
+        assert topology.edgeFaces(ix).tolist() == adjacent
+    assert topology.edgeValence().tolist() == [len(edgeFaces[edge]) for edge in sorted(edgeFaces)]
+
+def test_faceEdgesFollowCornerOrder():
+    faces = randomFaces(1)
+    topology = MeshTopology(faces)
+    for (v1, v2, v3), edges in zip(faces.tolist(), topology.faceEdges.tolist()):
+        assert edges == [topology.edgeIndex(v1,v2), topology.edgeIndex(v2,v3), topology.edgeIndex(v3,v1)]
+
+def test_vertexFacesMatchBruteForce():
+    faces = randomFaces(2)
+    topology = MeshTopology(faces)
+    for vertex in range(faces.max()+2):
+        expected = [face for face, corners in enumerate(faces.tolist()) for corner in corners if corner == vertex]
+        assert topology.vertexFaces(vertex).tolist() == expected
+
+def test_missingEdgeRaises():
+    topology = MeshTopology([[0,1,2]])
+    with pytest.raises(KeyError):
+        topology.edgeIndex(0,3)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:44:08 2026
+
+@author: AsteriskAmpersand
+"""
+import numpy as np
+import pytest
+
+import Mod3VertexArrays as VA
+from Mod3VertexBuffers import Mod3Vertex, Mod3VertexWeightBase, Mod3VertexWeightExtended
+from FileLike import FileLike, MappedFileLike
+
+blocktypes = sorted(Mod3Vertex.blocklist)
+
+def randomBlock(blocktype, count = 24, seed = 0):
+    #Random vertex block with finite half floats so every codec path round trips exactly
+    rng = np.random.default_rng(seed)
+    vertexBlock = np.zeros(count, dtype = VA.blockDtype(blocktype))
+    vertexBlock["position"] = rng.uniform(-100, 100, vertexBlock["position"].shape)
+    vertexBlock["normal"] = rng.integers(-127, 128, vertexBlock["normal"].shape)
+    vertexBlock["tangent"] = rng.integers(-127, 128, vertexBlock["tangent"].shape)
+    vertexBlock["uvs"] = rng.uniform(-4, 4, vertexBlock["uvs"].shape).astype(np.float16).view(np.uint16)
+    for name in ("weights", "weightBytes", "boneIds", "colour"):
+        if name in vertexBlock.dtype.names:
+            info = np.iinfo(vertexBlock.dtype[name].base)
+            vertexBlock[name] = rng.integers(0, info.max, vertexBlock[name].shape, endpoint = True)
+    return vertexBlock.tobytes()
+
+@pytest.mark.parametrize("blocktype", blocktypes)
+def test_blockDtypeMatchesVertexLayout(blocktype):
+    assert VA.blockDtype(blocktype).itemsize == len(Mod3Vertex(blocktype))
+
+@pytest.mark.parametrize("blocktype", blocktypes)
+def test_readVertexBlockMatchesVertexObjects(blocktype):
+    raw = randomBlock(blocktype)
+    for source in (FileLike(raw), MappedFileLike(raw)):
+        vertexBlock = VA.readVertexBlock(source, blocktype, 24)
+        assert vertexBlock.tobytes() == raw
+    vertices = VA.vertexObjects(vertexBlock, blocktype)
+    assert b''.join([vertex.serialize() for vertex in vertices]) == raw
+    assert VA.blockFromVertices(vertices, blocktype).tobytes() == raw
+
+@pytest.mark.parametrize("blocktype", blocktypes)
+def test_decodedColumnsEncodeToSameBytes(blocktype):
+    raw = randomBlock(blocktype)
+    columns = VA.decodeVertices(FileLike(raw), blocktype, 24)
+    assert np.array_equal(columns["position"], np.frombuffer(raw, VA.blockDtype(blocktype))["position"])
+    if "weights" in columns:
+        columns["weights"], columns["bits"] = VA.decodeWeights(columns["weights"], columns.pop("weightBytes", None))
+    assert VA.encodeVertices(columns, blocktype).tobytes() == raw
+
+def extendedWeights(tenBitParts, byteWeights, bits = 0):
+    tenBitWeight = sum([part<<(10*ix) for ix, part in enumerate(tenBitParts)]) + (bits<<30)
+    return np.array([tenBitWeight], dtype = np.uint32), np.array([byteWeights], dtype = np.uint8)
+
+def test_eightWeightsMatchLegacyCodec():
+    rng = np.random.default_rng(3)
+    tenBitWeights = rng.integers(0, 1<<32, 32, dtype = np.uint64).astype(np.uint32)
+    weightBytes = rng.integers(0, 256, (32,4)).astype(np.uint8)
+    weights, bits = VA.decodeWeights(tenBitWeights, weightBytes)
+    assert np.array_equal(bits, tenBitWeights >> 30)
+    for word, extra, row in zip(tenBitWeights, weightBytes, weights):
+        legacy = Mod3VertexWeightExtended()
+        legacy.marshall(FileLike(word.tobytes() + extra.tobytes()))
+        assert np.allclose(legacy.weights, row)
+
+def test_eightWeightLastWeightIsComplementOfTheOthers():
+    weights, _ = VA.decodeWeights(*extendedWeights([307,205,102],[25,25,13,13]))
+    assert np.isclose(weights[0,7], 1.0 - weights[0,:7].sum())
+    assert weights[0,7] > 0.05
+    assert np.allclose(weights.sum(axis = 1), 1.0)
+
+def test_fourWeightsMatchLegacyCodec():
+    rng = np.random.default_rng(1)
+    parts = rng.integers(0, 341, (32,3))
+    bits = rng.integers(0, 4, 32)
+    tenBitWeights = ((parts << VA.TEN_BIT_SHIFTS).sum(axis = 1) + (bits << 30)).astype(np.uint32)
+    weights, decodedBits = VA.decodeWeights(tenBitWeights)
+    assert np.array_equal(decodedBits, bits)
+    assert np.allclose(weights.sum(axis = 1), 1)
+    for word, row in zip(tenBitWeights, weights):
+        legacy = Mod3VertexWeightBase()
+        legacy.marshall(FileLike(word.tobytes()))
+        assert np.allclose(legacy.weights, row)
+        assert legacy.serialize() == word.tobytes()
+    assert np.array_equal(VA.encodeWeights(weights, decodedBits)[0], tenBitWeights)
+
+def test_eightWeightsRoundTrip():
+    rng = np.random.default_rng(2)
+    tenBitWeights = rng.integers(0, 1<<32, 32, dtype = np.uint64).astype(np.uint32)
+    weightBytes = rng.integers(0, 256, (32,4)).astype(np.uint8)
+    weights, bits = VA.decodeWeights(tenBitWeights, weightBytes)
+    encoded, encodedBytes = VA.encodeWeights(weights, bits)
+    assert np.array_equal(encoded, tenBitWeights)
+    assert np.array_equal(encodedBytes, weightBytes)
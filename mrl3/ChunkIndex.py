@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 19:02:37 2026
+
+@author: AsteriskAmpersand
+"""
+import os
+import json
+import tempfile
+try:
+    from ..common.crc import generalhash
+except:
+    import sys
+    sys.path.insert(0, r'..\common')
+    from crc import generalhash
+
+def indexKey(relativePath):
+    return relativePath.replace("\\","/").strip("/").lower()
+
+class ChunkIndex():
+    """Texture files under a root directory, lowercased relative path without extension -> extensions.
+
+    Every directory record keeps its mtime, subdirectories and files, refresh only lists
+    directories whose mtime changed since the last scan. With a cachePath the records are
+    persisted as json between sessions.
+    """
+    extensions = (".png",".dds",".tex")
+
+    def __init__(self, root, cachePath = None, recursive = True):
+        self.root = os.path.abspath(root)
+        self.cachePath = cachePath
+        self.recursive = recursive
+        self.directories = {}
+        self.paths = {}
+        if cachePath and os.path.exists(cachePath):
+            try:
+                with open(cachePath, "r") as cache:
+                    self.directories = json.load(cache)
+            except (OSError, ValueError):
+                self.directories = {}
+
+    def scanDirectory(self, relativeDirectory, mtime):
+        subdirectories, files = [], {}
+        with os.scandir(os.path.join(self.root, relativeDirectory)) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subdirectories.append(entry.name)
+                    continue
+                stem, extension = os.path.splitext(entry.name)
+                extension = extension.lower()
+                if extension in self.extensions:
+                    files.setdefault(stem, []).append(extension)
+        return [mtime, subdirectories, files]
+
+    def refresh(self):
+        directories = {}
+        pending = [""]
+        while pending:
+            relativeDirectory = pending.pop()
+            try:
+                mtime = os.stat(os.path.join(self.root, relativeDirectory)).st_mtime_ns
+            except OSError:
+                continue
+            record = self.directories.get(relativeDirectory)
+            if record is None or record[0] != mtime:
+                try:
+                    record = self.scanDirectory(relativeDirectory, mtime)
+                except OSError:
+                    continue
+            directories[relativeDirectory] = record
+            if self.recursive:
+                pending.extend(os.path.join(relativeDirectory, subdirectory) for subdirectory in record[1])
+        changed = directories != self.directories
+        self.directories = directories
+        self.paths = {indexKey(os.path.join(relativeDirectory, stem)):(os.path.join(relativeDirectory, stem), extensions)
+                        for relativeDirectory, (_, _, files) in directories.items()
+                        for stem, extensions in files.items()}
+        if changed:
+            self.save()
+        return self
+
+    def save(self):
+        if not self.cachePath:
+            return
+        try:
+            with open(self.cachePath, "w") as cache:
+                json.dump(self.directories, cache)
+        except OSError:
+            pass
+
+    def lookup(self, relativePath):
+        #Returns (absolute path without extension, extensions) or None
+        entry = self.paths.get(indexKey(relativePath))
+        if entry is None:
+            return None
+        return os.path.join(self.root, entry[0]), entry[1]
+
+def defaultCachePath(root):
+    return os.path.join(tempfile.gettempdir(), "mod3ChunkIndex_%08X.json"%generalhash(os.path.abspath(root).lower()))
+
+chunkIndices = {}
+
+def getChunkIndex(root):
+    """Session wide index of a chunk directory, refreshed incrementally on every call."""
+    root = os.path.abspath(root)
+    if root not in chunkIndices:
+        chunkIndices[root] = ChunkIndex(root, defaultCachePath(root))
+    return chunkIndices[root].refresh()
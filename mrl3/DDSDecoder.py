@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 21:14:52 2026
+
+@author: AsteriskAmpersand
+"""
+import struct
+import numpy as np
+
+#Decoders take an (N,blockBytes) uint8 array of blocks and return (N,16,4) uint8 RGBA texels
+#in row major order within the block.
+
+def expand565(colour):
+    colour = colour.astype(np.int32)
+    r, g, b = (colour >> 11) & 31, (colour >> 5) & 63, colour & 31
+    return np.stack([r << 3 | r >> 2, g << 2 | g >> 4, b << 3 | b >> 2], axis = -1)
+
+def decodeColourBlocks(blocks, punchThrough = True):
+    #BC1 style colour half, c0 <= c1 selects the 3 colour + transparent black palette on BC1 only
+    endpoints = blocks[:,:4].copy().view('<u2')
+    c0, c1 = expand565(endpoints[:,0]), expand565(endpoints[:,1])
+    four = (endpoints[:,0] > endpoints[:,1])[:,None]
+    if not punchThrough:
+        four = np.ones_like(four)
+    palette = np.empty((len(blocks),4,4), dtype = np.int32)
+    palette[:,0,:3], palette[:,1,:3] = c0, c1
+    palette[:,2,:3] = np.where(four, (2*c0 + c1)//3, (c0 + c1)//2)
+    palette[:,3,:3] = np.where(four, (c0 + 2*c1)//3, 0)
+    palette[:,:,3] = 255
+    palette[:,3,3] = np.where(four[:,0], 255, 0)
+    indices = (blocks[:,4:8].copy().view('<u4').astype(np.int64) >> (2*np.arange(16))) & 3
+    return np.take_along_axis(palette, indices[:,:,None], axis = 1).astype(np.uint8)
+
+def decodeChannelBlocks(blocks):
+    #BC4 style 8 byte single channel block, returns (N,16)
+    a0, a1 = blocks[:,0].astype(np.int32), blocks[:,1].astype(np.int32)
+    eight = (a0 > a1)[:,None]
+    i = np.arange(2,8)
+    palette = np.empty((len(blocks),8), dtype = np.int32)
+    palette[:,0], palette[:,1] = a0, a1
+    palette[:,2:] = np.where(eight, ((8-i)*a0[:,None] + (i-1)*a1[:,None])//7, 0)
+    sixth = ((6-i[:4])*a0[:,None] + (i[:4]-1)*a1[:,None])//5
+    palette[:,2:6] = np.where(eight, palette[:,2:6], sixth)
+    palette[:,6] = np.where(eight[:,0], palette[:,6], 0)
+    palette[:,7] = np.where(eight[:,0], palette[:,7], 255)
+    bits = np.zeros((len(blocks),8), dtype = np.uint8)
+    bits[:,:6] = blocks[:,2:8]
+    indices = (bits.view('<u8')[:,0:1] >> (3*np.arange(16, dtype = np.uint64))) & np.uint64(7)
+    return np.take_along_axis(palette, indices.astype(np.int64), axis = 1).astype(np.uint8)
+
+def decodeBC1(blocks):
+    return decodeColourBlocks(blocks)
+
+def decodeBC2(blocks):
+    texels = decodeColourBlocks(blocks[:,8:], punchThrough = False)
+    alpha = blocks[:,:8].copy().view('<u8')[:,0:1] >> (4*np.arange(16, dtype = np.uint64))
+    texels[:,:,3] = (alpha & np.uint64(15)).astype(np.uint8)*17
+    return texels
+
+def decodeBC3(blocks):
+    texels = decodeColourBlocks(blocks[:,8:], punchThrough = False)
+    texels[:,:,3] = decodeChannelBlocks(blocks[:,:8])
+    return texels
+
+def decodeBC4(blocks):
+    texels = np.empty((len(blocks),16,4), dtype = np.uint8)
+    texels[:,:,:3] = decodeChannelBlocks(blocks)[:,:,None]
+    texels[:,:,3] = 255
+    return texels
+
+def decodeBC5(blocks):
+    texels = np.zeros((len(blocks),16,4), dtype = np.uint8)
+    texels[:,:,0] = decodeChannelBlocks(blocks[:,:8])
+    texels[:,:,1] = decodeChannelBlocks(blocks[:,8:])
+    texels[:,:,3] = 255
+    return texels
+
+#BC7 modes: subsets, partition bits, rotation bits, index selection bits, colour bits,
+#alpha bits, endpoint p-bits, shared p-bits, index bits, secondary index bits
+BC7_MODES = [(3,4,0,0,4,0,1,0,3,0),
+             (2,6,0,0,6,0,0,1,3,0),
+             (3,6,0,0,5,0,0,0,2,0),
+             (2,6,0,0,7,0,1,0,2,0),
+             (1,0,2,1,5,6,0,0,2,3),
+             (1,0,2,0,7,8,0,0,2,2),
+             (1,0,0,0,7,7,1,0,4,0),
+             (2,6,0,0,5,5,1,0,2,0)]
+
+BC7_WEIGHTS = {2:np.array([0,21,43,64]),
+               3:np.array([0,9,18,27,37,46,55,64]),
+               4:np.array([0,4,9,13,17,21,26,30,34,38,43,47,51,55,60,64])}
+
+BC7_PARTITIONS2 = np.array([[(mask >> i) & 1 for i in range(16)] for mask in
+    [0xCCCC,0x8888,0xEEEE,0xECC8,0xC880,0xFEEC,0xFEC8,0xEC80,0xC800,0xFFEC,0xFE80,0xE800,0xFFE8,0xFF00,0xFFF0,0xF000,
+     0xF710,0x008E,0x7100,0x08CE,0x008C,0x7310,0x3100,0x8CCE,0x088C,0x3110,0x6666,0x366C,0x17E8,0x0FF0,0x718E,0x399C,
+     0xAAAA,0xF0F0,0x5A5A,0x33CC,0x3C3C,0x55AA,0x9696,0xA55A,0x73CE,0x13C8,0x324C,0x3BDC,0x6996,0xC33C,0x9966,0x0660,
+     0x0272,0x04E4,0x4E40,0x2720,0xC936,0x936C,0x39C6,0x639C,0x9336,0x9CC6,0x817E,0xE718,0xCCF0,0x0FCC,0x7744,0xEE22]])
+
+BC7_PARTITIONS3 = np.array([[int(subset) for subset in partition] for partition in
+    ["0011001102212222","0001001122112221","0000200122112211","0222002200110111",
+     "0000000011221122","0011001100220022","0022002211111111","0011001122112211",
+     "0000000011112222","0000111111112222","0000111122222222","0012001200120012",
+     "0112011201120112","0122012201220122","0011011211221222","0011200122002220",
+     "0001001101121122","0111001120012200","0000112211221122","0022002200221111",
+     "0111011102220222","0001000122212221","0000001101220122","0000110022102210",
+     "0122012200110000","0012001211222222","0110122112210110","0000011012211221",
+     "0022110211020022","0110011020022222","0011012201220011","0000200022112221",
+     "0000000211221222","0222002200120011","0011001200220222","0120012001200120",
+     "0000111122220000","0120120120120120","0120201212010120","0011220011220011",
+     "0011112222000011","0101010122222222","0000000021212121","0022112200221122",
+     "0022001100220011","0220122102201221","0101222222220101","0000212121212121",
+     "0101010101012222","0222011102220111","0002111200021112","0000211221122112",
+     "0222011101110222","0002111211120002","0110011001102222","0000000021122112",
+     "0110011022222222","0022001100110022","0022112211220022","0000000000002112",
+     "0002000100020001","0222122202221222","0101222222222222","0111201122012220"]])
+
+BC7_ANCHORS2 = np.array([15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,
+                         15, 2, 8, 2, 2, 8, 8,15, 2, 8, 2, 2, 8, 8, 2, 2,
+                         15,15, 6, 8, 2, 8,15,15, 2, 8, 2, 2, 2,15,15, 6,
+                          6, 2, 6, 8,15,15, 2, 2,15,15,15,15,15, 2, 2,15])
+
+BC7_ANCHORS3 = np.array([[ 3, 3,15,15, 8, 3,15,15, 8, 8, 6, 6, 6, 5, 3, 3,
+                           3, 3, 8,15, 3, 3, 6,10, 5, 8, 8, 6, 8, 5,15,15,
+                           8,15, 3, 5, 6,10, 8,15,15, 3,15, 5,15,15,15,15,
+                           3,15, 5, 5, 5, 8, 5,10, 5,10, 8,13,15,12, 3, 3],
+                         [15, 8, 8, 3,15,15, 3, 8,15,15,15,15,15,15,15, 8,
+                          15, 8,15, 3,15, 8,15, 8, 3,15, 6,10,15,15,10, 8,
+                          15, 3,15,10,10, 8, 9,10, 6,15, 8,15, 3, 6, 6, 8,
+                          15, 3,15,15,15,15,15,15,15,15,15,15, 3,15,15, 8]])
+
+def bitField(bits, start, count):
+    return bits[:,start:start+count].astype(np.int64) @ (1 << np.arange(count, dtype = np.int64))
+
+def indexField(bits, start, bitCount, anchors):
+    #16 indices whose anchor texels store one bit less, anchors is an (N,16) bool array
+    widths = bitCount - anchors
+    offsets = start + np.concatenate([np.zeros((len(bits),1), dtype = np.int64), np.cumsum(widths, axis = 1)[:,:-1]], axis = 1)
+    positions = np.minimum(offsets[:,:,None] + np.arange(bitCount), 127)
+    values = np.take_along_axis(bits, positions.reshape(len(bits),-1), axis = 1).reshape(len(bits),16,bitCount)
+    values = values.astype(np.int64) * (np.arange(bitCount) < widths[:,:,None])
+    return (values << np.arange(bitCount)).sum(axis = 2), start + 16*bitCount - anchors.sum(axis = 1)[0]
+
+def unquantize(value, bits):
+    value = value << (8 - bits)
+    return value | (value >> bits)
+
+def decodeBC7Mode(bits, mode):
+    subsets, partitionBits, rotationBits, selectionBits, colourBits, alphaBits, endpointP, sharedP, indexBits, index2Bits = BC7_MODES[mode]
+    count = len(bits)
+    position = mode+1
+    partition = bitField(bits, position, partitionBits); position += partitionBits
+    rotation = bitField(bits, position, rotationBits); position += rotationBits
+    selection = bitField(bits, position, selectionBits); position += selectionBits
+    endpoints = np.empty((count, 2*subsets, 4), dtype = np.int64)
+    for channel in range(3):
+        for endpoint in range(2*subsets):
+            endpoints[:,endpoint,channel] = bitField(bits, position, colourBits); position += colourBits
+    for endpoint in range(2*subsets):
+        endpoints[:,endpoint,3] = bitField(bits, position, alphaBits) if alphaBits else 255
+        position += alphaBits
+    channelBits = np.array([colourBits]*3 + [alphaBits])
+    if endpointP or sharedP:
+        pCount = 2*subsets if endpointP else subsets
+        pbits = bits[:,position:position+pCount].astype(np.int64); position += pCount
+        if sharedP:
+            pbits = np.repeat(pbits, 2, axis = 1)
+        endpoints[:,:,:3] = endpoints[:,:,:3] << 1 | pbits[:,:,None]
+        if alphaBits:
+            endpoints[:,:,3] = endpoints[:,:,3] << 1 | pbits
+        channelBits = channelBits + 1
+    for channel in range(4 if alphaBits else 3):
+        endpoints[:,:,channel] = unquantize(endpoints[:,:,channel], channelBits[channel])
+    if subsets == 1:
+        subset = np.zeros((count,16), dtype = np.int64)
+        anchors = np.zeros((count,16), dtype = np.int64)
+    elif subsets == 2:
+        subset = BC7_PARTITIONS2[partition]
+        anchors = np.arange(16) == BC7_ANCHORS2[partition][:,None]
+    else:
+        subset = BC7_PARTITIONS3[partition]
+        anchors = (np.arange(16) == BC7_ANCHORS3[0][partition][:,None]) | (np.arange(16) == BC7_ANCHORS3[1][partition][:,None])
+    anchors = (anchors | (np.arange(16) == 0)).astype(np.int64)
+    indices, position = indexField(bits, position, indexBits, anchors)
+    colourWeights = alphaWeights = BC7_WEIGHTS[indexBits][indices]
+    if index2Bits:
+        indices2, position = indexField(bits, position, index2Bits, (np.arange(16) == 0).astype(np.int64)[None].repeat(count, axis = 0))
+        weights2 = BC7_WEIGHTS[index2Bits][indices2]
+        swap = (selection == 1)[:,None]
+        colourWeights, alphaWeights = np.where(swap, weights2, colourWeights), np.where(swap, colourWeights, weights2)
+    e0 = np.take_along_axis(endpoints, (2*subset)[:,:,None], axis = 1)
+    e1 = np.take_along_axis(endpoints, (2*subset+1)[:,:,None], axis = 1)
+    weights = np.concatenate([np.repeat(colourWeights[:,:,None], 3, axis = 2), alphaWeights[:,:,None]], axis = 2)
+    texels = ((64 - weights)*e0 + weights*e1 + 32) >> 6
+    for rotationMode, channel in ((1,0),(2,1),(3,2)):
+        rotate = rotation == rotationMode
+        texels[rotate,:,channel], texels[rotate,:,3] = texels[rotate,:,3], texels[rotate,:,channel].copy()
+    return texels.astype(np.uint8)
+
+def decodeBC7(blocks):
+    texels = np.zeros((len(blocks),16,4), dtype = np.uint8)
+    lowest = blocks[:,0] & (~blocks[:,0] + np.uint8(1))
+    mode = np.where(blocks[:,0] == 0, 8, np.log2(np.maximum(lowest, 1)).astype(np.int64))
+    bits = np.unpackbits(blocks, axis = 1, bitorder = 'little')
+    for blockMode in range(8):
+        selected = mode == blockMode
+        if selected.any():
+            texels[selected] = decodeBC7Mode(bits[selected], blockMode)
+    return texels
+
+blockSizes = {"BC1":8, "BC2":16, "BC3":16, "BC4":8, "BC5":16, "BC6H":16, "BC7":16}
+
+blockDecoders = {"BC1":decodeBC1, "BC2":decodeBC2, "BC3":decodeBC3,
+                 "BC4":decodeBC4, "BC5":decodeBC5, "BC7":decodeBC7}
+
+uncompressedLayouts = {"RGBA8":(4,[0,1,2,3]), "BGRA8":(4,[2,1,0,3]), "BGRX8":(4,[2,1,0,None]), "BGR8":(3,[2,1,0,None])}
+
+def canDecode(textureFormat):
+    return textureFormat in uncompressedLayouts or textureFormat in blockDecoders
+
+def surfaceSize(textureFormat, width, height):
+    if textureFormat in blockSizes:
+        return max(1,(width+3)//4) * max(1,(height+3)//4) * blockSizes[textureFormat]
+    return width * height * uncompressedLayouts[textureFormat][0]
+
+def decodeSurface(buffer, textureFormat, width, height):
+    """Decodes one mip level into a top-down (height,width,4) uint8 RGBA array."""
+    size = surfaceSize(textureFormat, width, height)
+    data = np.frombuffer(buffer, dtype = np.uint8, count = size)
+    if textureFormat in uncompressedLayouts:
+        pixelSize, channels = uncompressedLayouts[textureFormat]
+        data = data.reshape(height, width, pixelSize)
+        pixels = np.full((height, width, 4), 255, dtype = np.uint8)
+        for target, source in enumerate(channels):
+            if source is not None:
+                pixels[:,:,target] = data[:,:,source]
+        return pixels
+    if textureFormat not in blockDecoders:
+        raise ValueError("No decoder for %s"%textureFormat)
+    blockBytes, decoder = blockSizes[textureFormat], blockDecoders[textureFormat]
+    blocksWide, blocksHigh = max(1,(width+3)//4), max(1,(height+3)//4)
+    texels = decoder(data.reshape(-1, blockBytes))
+    pixels = texels.reshape(blocksHigh, blocksWide, 4, 4, 4).transpose(0,2,1,3,4).reshape(blocksHigh*4, blocksWide*4, 4)
+    return np.ascontiguousarray(pixels[:height,:width])
+
+fourCCFormats = {b"DXT1":"BC1", b"DXT2":"BC2", b"DXT3":"BC2", b"DXT4":"BC3", b"DXT5":"BC3",
+                 b"ATI1":"BC4", b"BC4U":"BC4", b"ATI2":"BC5", b"BC5U":"BC5"}
+
+dxgiFormats = {28:"RGBA8", 29:"RGBA8", 87:"BGRA8", 88:"BGRX8", 91:"BGRA8", 93:"BGRX8",
+               71:"BC1", 72:"BC1", 74:"BC2", 75:"BC2", 77:"BC3", 78:"BC3",
+               80:"BC4", 83:"BC5", 95:"BC6H", 98:"BC7", 99:"BC7"}
+
+srgbDxgiFormats = {29, 72, 75, 78, 91, 93, 99}
+
+dxgiCodes = {"RGBA8":(28,29), "BGRA8":(87,91), "BGRX8":(88,93), "BC1":(71,72), "BC2":(74,75), "BC3":(77,78),
+             "BC4":(80,80), "BC5":(83,83), "BC6H":(95,95), "BC7":(98,99)}
+
+def ddsHeader(textureFormat, width, height, mipCount, srgb = False):
+    """DX10 DDS header for a single 2D surface with its mip chain."""
+    flags = 0x1 | 0x2 | 0x4 | 0x1000 | 0x20000 | 0x80000
+    caps = 0x1000 | (0x400008 if mipCount > 1 else 0)
+    header = struct.pack("<4sIIIIIII44s", b"DDS ", 124, flags, height, width,
+                         surfaceSize(textureFormat, width, height), 0, mipCount, b"")
+    header += struct.pack("<II4sI4I", 32, 0x4, b"DX10", 0, 0, 0, 0, 0)
+    header += struct.pack("<IIIII", caps, 0, 0, 0, 0)
+    return header + struct.pack("<IIIII", dxgiCodes[textureFormat][srgb], 3, 0, 1, 0)
+
+class DDSTexture():
+    """DDS header and mip chain of the first surface, decoded in process without external tools."""
+    def __init__(self, data):
+        if bytes(data[:4]) != b"DDS ":
+            raise ValueError("Not a DDS file")
+        self.data = data
+        self.height, self.width = struct.unpack_from("<II", data, 12)
+        self.mipCount = max(1, struct.unpack_from("<I", data, 28)[0])
+        pixelFlags, fourCC, bitCount = struct.unpack_from("<I4sI", data, 80)
+        masks = struct.unpack_from("<4I", data, 92)
+        self.srgb = False
+        offset = 128
+        if pixelFlags & 0x4 and fourCC == b"DX10":
+            dxgiFormat = struct.unpack_from("<I", data, 128)[0]
+            offset += 20
+            if dxgiFormat not in dxgiFormats:
+                raise ValueError("Unsupported DXGI format %d"%dxgiFormat)
+            self.format = dxgiFormats[dxgiFormat]
+            self.srgb = dxgiFormat in srgbDxgiFormats
+        elif pixelFlags & 0x4:
+            if fourCC not in fourCCFormats:
+                raise ValueError("Unsupported FourCC %s"%fourCC)
+            self.format = fourCCFormats[fourCC]
+        elif bitCount == 32 and masks[:3] == (0xFF, 0xFF00, 0xFF0000):
+            self.format = "RGBA8"
+        elif bitCount == 32 and masks[:3] == (0xFF0000, 0xFF00, 0xFF):
+            self.format = "BGRA8" if pixelFlags & 0x1 else "BGRX8"
+        elif bitCount == 24 and masks[:3] == (0xFF0000, 0xFF00, 0xFF):
+            self.format = "BGR8"
+        else:
+            raise ValueError("Unsupported uncompressed DDS layout")
+        self.mipOffsets = []
+        width, height = self.width, self.height
+        for _ in range(self.mipCount):
+            self.mipOffsets.append(offset)
+            offset += surfaceSize(self.format, width, height)
+            width, height = max(1, width//2), max(1, height//2)
+
+    @classmethod
+    def fromPath(cls, path):
+        with open(path, "rb") as ddsFile:
+            return cls(ddsFile.read())
+
+    def mipDimensions(self, mip):
+        return max(1, self.width >> mip), max(1, self.height >> mip)
+
+    def decode(self, mip = 0, dtype = np.uint8):
+        """Top-down (height,width,4) RGBA pixels of a mip level, float dtypes are scaled to [0,1]."""
+        width, height = self.mipDimensions(mip)
+        pixels = decodeSurface(memoryview(self.data)[self.mipOffsets[mip]:], self.format, width, height)
+        if np.dtype(dtype).kind == 'f':
+            return pixels.astype(dtype) / np.dtype(dtype).type(255)
+        return pixels
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 00:41:09 2026
+
+@author: AsteriskAmpersand
+"""
+import struct
+import numpy as np
+try:
+    from ..common.FileLike import MappedFileLike
+    from ..mrl3.DDSDecoder import decodeSurface, surfaceSize, ddsHeader
+except:
+    import sys
+    sys.path.insert(0, r'..\common')
+    sys.path.insert(0, r'..\mrl3')
+    from FileLike import MappedFileLike
+    from DDSDecoder import decodeSurface, surfaceSize, ddsHeader
+
+#TEX format id -> (surface format, sRGB)
+texFormats = {7:("RGBA8",False), 9:("RGBA8",True),
+              22:("BC1",False), 23:("BC1",True), 24:("BC4",False), 26:("BC5",False),
+              28:("BC6H",False), 30:("BC7",False), 31:("BC7",True)}
+
+class MHWTexture():
+    """MHW .tex header and mip table, mip payloads are views into the mapped file.
+    
+    Header fields used: mipCount 0x10, width 0x14, height 0x18, imageCount 0x1C,
+    format 0x20 and the uint64 mip offset table at 0xB8, imageCount*mipCount entries.
+    """
+    mipTableOffset = 0xB8
+    
+    def __init__(self, data):
+        if bytes(data[:4]) != b"TEX\x00":
+            raise ValueError("Not a MHW TEX file")
+        self.data = memoryview(data)
+        self.mipCount, self.width, self.height, self.imageCount, formatId = struct.unpack_from("<5I", self.data, 0x10)
+        if formatId not in texFormats:
+            raise ValueError("Unsupported TEX format %d"%formatId)
+        self.formatId = formatId
+        self.format, self.srgb = texFormats[formatId]
+        self.imageCount = max(1, self.imageCount)
+        self.mipOffsets = struct.unpack_from("<%dQ"%(self.mipCount*self.imageCount), self.data, self.mipTableOffset)
+        self.source = None
+        
+    @classmethod
+    def fromPath(cls, path):
+        source = MappedFileLike.fromPath(path)
+        texture = cls(source.data)
+        texture.source = source
+        return texture
+    
+    def close(self):
+        self.data = None
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+            
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+        
+    def mipDimensions(self, mip):
+        return max(1, self.width >> mip), max(1, self.height >> mip)
+    
+    def mipPayload(self, mip = 0, image = 0):
+        offset = self.mipOffsets[image*self.mipCount + mip]
+        size = surfaceSize(self.format, *self.mipDimensions(mip))
+        if offset + size > len(self.data):
+            raise ValueError("Mip %d of image %d runs past the end of the file"%(mip, image))
+        return self.data[offset:offset+size]
+    
+    def decode(self, mip = 0, image = 0, dtype = np.uint8):
+        """Top-down (height,width,4) RGBA pixels of a mip level, float dtypes are scaled to [0,1]."""
+        width, height = self.mipDimensions(mip)
+        pixels = decodeSurface(self.mipPayload(mip, image), self.format, width, height)
+        if np.dtype(dtype).kind == 'f':
+            return pixels.astype(dtype) / np.dtype(dtype).type(255)
+        return pixels
+    
+    def writeDDS(self, fileobj, image = 0):
+        fileobj.write(ddsHeader(self.format, self.width, self.height, self.mipCount, self.srgb))
+        for mip in range(self.mipCount):
+            fileobj.write(self.mipPayload(mip, image))
+            
+def convertTexToDDS(path, outputPath = None):
+    """Writes the first image of a .tex as a .dds next to it, returns the dds path."""
+    outputPath = outputPath if outputPath else path[:-4]+".dds"
+    with MHWTexture.fromPath(path) as texture, open(outputPath, "wb") as ddsFile:
+        texture.writeDDS(ddsFile)
+    return outputPath
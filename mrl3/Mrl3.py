@@ -5,24 +5,27 @@ Created on Sun Jan 13 00:07:45 2019
 @author: AsteriskAmpersand
 """
 
+import os
 from collections import OrderedDict
 try:
     from ..common import Cstruct as CS
+    from ..common.FileLike import MappedFileLike
     from ..mrl3.maptype import maptypeTranslation
+    from ..common.crc import generalhash
 except:
     import sys
     sys.path.insert(0, r'..\common')
     sys.path.insert(0, r'..\mrl3')
     import Cstruct as CS
+    from FileLike import MappedFileLike
     from maptype import maptypeTranslation
+    from crc import generalhash
 
 translation = lambda x: maptypeTranslation[x>>12]
 intBytes = lambda x: int.from_bytes(x, byteorder='little', signed=False)
 hex_read = lambda f,x: intBytes(f.read(x))
 
-from ..common.crc import CrcJamcrc
 #from crccheck.crc import CrcJamcrc
-generalhash =  lambda x:  CrcJamcrc.calc(x.encode())
 
 class MRL3Header(CS.PyCStruct):
     fields = OrderedDict([
@@ -82,6 +85,8 @@ class MRL3Material():
         self.Header = MRL3MaterialHeader()
         self.resourceBindings = []
         self.paramArray = []
+        self.mapTypes = OrderedDict()
+        self.albedoIndex = 0
     
     def marshall(self, data):
         self.Header.marshall(data)
@@ -92,21 +97,30 @@ class MRL3Material():
         self.paramArray = MRL3ParameterArray(self)
         self.paramArray.marshall(data)
         data.seek(pos)
+        self.indexBindings()
+        
+    def indexBindings(self):
+        #mapTypeName -> texIdx in binding order, the first binding of a map type wins
+        self.mapTypes = OrderedDict()
+        for resource in self.resourceBindings:
+            self.mapTypes.setdefault(resource.mapTypeName, resource.texIdx)
+        self.albedoIndex = next((texIdx for mapType, texIdx in self.mapTypes.items() if "ALBEDO" in mapType.upper()), 0)
         
     def serialize(self):
         return self.Header.serialize()+b''.join(map(lambda x: x.serialize(),self.textureArguments))+self.paramArray.serialize()
     
     def getAlbedoIndex(self):
-        for resource in self.resourceBindings:
-            if "Albedo".upper() in resource.mapTypeName.upper():
-                return resource.texIdx
-        return 0
+        return self.albedoIndex
+    
+    def getTextureIndex(self, mapType):
+        return self.mapTypes.get(mapType, 0)
     
 class MRL3():
     def __init__(self):
         self.Header = MRL3Header()
         self.Textures = []
         self.Materials = []
+        self.materialIndex = {}
         
     def marshall(self, file):
         self.Header.marshall(file)
@@ -116,13 +130,60 @@ class MRL3():
         file.seek(self.Header.materialOffset)
         self.Materials = [MRL3Material() for _ in range(self.Header.materialCount)]
         [mat.marshall(file) for mat in self.Materials]
+        self.materialIndex = {}
+        for material in self.Materials:
+            self.materialIndex.setdefault(material.Header.materialNameHash, material)
+            
+    def getMaterial(self, materialString):
+        material = self.materialIndex.get(generalhash(materialString))
+        if material is None:
+            raise KeyError(materialString)
+        return material
+    
+    def getTexturePath(self, materialString, mapType = None):
+        #Albedo texture of the material when no mapType name is given
+        material = self.getMaterial(materialString)
+        index = (material.getAlbedoIndex() if mapType is None else material.getTextureIndex(mapType))-1
+        if index < 0 or index >= len(self.Textures):
+            raise KeyError(materialString)
+        return self.Textures[index].path.replace("\x00","")
         
     def __getitem__(self, materialString):
-        idHash = generalhash(materialString)
-        for material in self.Materials:
-            if material.Header.materialNameHash == idHash:
-                index = material.getAlbedoIndex()-1
-                if index < 0 or index > len(self.Textures):
-                    raise KeyError
-                return self.Textures[index].path.replace("\x00","")
-        raise KeyError
\ No newline at end of file
+        return self.getTexturePath(materialString)
+
+class MRL3Cache():
+    """Parsed MRL3 files keyed by (path, mtime, size) with least recently used eviction.
+    
+    Cached MRL3 are shared between callers and must be treated as read only.
+    """
+    def __init__(self, maxsize = 32):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def load(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        material = MRL3()
+        with MappedFileLike.fromPath(path) as data:
+            material.marshall(data)
+        for stale in [entry for entry in self.entries if entry[0] == path]:
+            del self.entries[stale]
+        self.entries[key] = material
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last = False)
+        return material
+    
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+materialCache = MRL3Cache()
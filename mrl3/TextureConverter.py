@@ -6,7 +6,20 @@ Created on Wed Mar 13 00:18:07 2019
 """
 import sys
 import os
+import shlex
+import shutil
+import hashlib
+import tempfile
 import subprocess
+import struct
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from ..mrl3 import MHWTex
+    from ..mrl3.DDSDecoder import DDSTexture, canDecode
+except:
+    sys.path.insert(0, r'..\mrl3')
+    import MHWTex
+    from DDSDecoder import DDSTexture, canDecode
 
 if sys.platform.startswith("win"):
     # Don't display the Windows GPF dialog if the invoked program dies.
@@ -23,20 +36,132 @@ else:
     subprocess_flags = 0
     
 
-def convertTexToDDS(path):
-    processLocation = os.path.join(os.path.dirname(__file__),"MHWorldTex.exe")
-    FNULL = open(os.devnull, 'w')
-    args = "\"" + processLocation + "\"" + " \"" + path + "\""
+#Converter argument templates per source extension, {source} is the input file and {output} the
+#output folder. Outside Windows they are read from MOD3_TEX_CONVERTER and MOD3_DDS_CONVERTER.
+if sys.platform.startswith("win"):
+    converterCommands = {".tex":[os.path.join(os.path.dirname(__file__),"MHWorldTex.exe"), "{source}"],
+                         ".dds":[os.path.join(os.path.dirname(__file__),"TexConv.exe"), "{source}", "-ft", "png", "-o", "{output}"]}
+else:
+    converterCommands = {extension:shlex.split(os.environ[variable]) 
+                            for extension, variable in [(".tex","MOD3_TEX_CONVERTER"), (".dds","MOD3_DDS_CONVERTER")]
+                            if os.environ.get(variable)}
+
+def runConverter(extension, path, outputFolder):
+    if extension not in converterCommands:
+        return False
+    args = [arg.format(source = path, output = outputFolder) for arg in converterCommands[extension]]
     try:
-        subprocess.check_output(args, stdin=FNULL, stderr=FNULL, shell=False, creationflags=subprocess_flags)
+        with open(os.devnull, 'w') as FNULL:
+            subprocess.check_output(args, stdin=FNULL, stderr=FNULL, shell=False, creationflags=subprocess_flags)
     except:
+        return False
+    return True
+
+def convertTexToDDS(path, outputPath = None):
+    """Writes a .tex as .dds, returns the dds path or None when no converter produced it."""
+    #Native for every format MHWTex knows, the external converter remains for the rest
+    outputPath = outputPath if outputPath else path[:-4]+".dds"
+    try:
+        return MHWTex.convertTexToDDS(path, outputPath)
+    except ValueError:
         pass
+    #The external converter writes next to its input
+    staged = outputPath[:-4]+".tex"
+    if os.path.abspath(staged) != os.path.abspath(path):
+        shutil.copyfile(path, staged)
+    try:
+        runConverter(".tex", staged, os.path.dirname(staged))
+    finally:
+        if os.path.abspath(staged) != os.path.abspath(path):
+            os.remove(staged)
+    return outputPath if os.path.exists(outputPath) else None
     
-def convertDDSToPNG(path):
-    processLocation = os.path.join(os.path.dirname(__file__),"TexConv.exe")
-    FNULL = open(os.devnull, 'w')
-    args = "\"" + processLocation + "\"" + " \"" + path + "\"" +" -ft png -o \""+os.path.dirname(path)+ "\""
+def convertDDSToPNG(path, outputFolder = None):
+    """Writes a .dds as .png into outputFolder, returns the png path or None when it failed."""
+    outputFolder = outputFolder if outputFolder else os.path.dirname(path)
+    outputPath = os.path.join(outputFolder, os.path.splitext(os.path.basename(path))[0]+".png")
+    runConverter(".dds", path, outputFolder)
+    return outputPath if os.path.exists(outputPath) else None
+
+def decodesInProcess(path):
+    """Whether the in process DDS and TEX decoders handle the texture, png is read directly."""
+    extension = os.path.splitext(path)[1].lower()
     try:
-        subprocess.check_output(args, stdin=FNULL, stderr=FNULL, shell=False, creationflags=subprocess_flags)
-    except:
-        pass
\ No newline at end of file
+        if extension == ".dds":
+            with open(path, "rb") as ddsFile:
+                return canDecode(DDSTexture(ddsFile.read(148)).format)
+        if extension == ".tex":
+            with MHWTex.MHWTexture.fromPath(path) as texture:
+                return canDecode(texture.format)
+    except (OSError, ValueError, struct.error):
+        return False
+    return extension == ".png"
+    
+class TextureCache():
+    """PNG conversions stored as cacheRoot/<source content hash>/<name>.png.
+    
+    Sources are converted concurrently on a bounded pool, sources already converted are served
+    from the cache and the least recently used entries are evicted past maxBytes.
+    """
+    def __init__(self, cacheRoot = None, maxBytes = 2<<30, workers = None):
+        self.cacheRoot = cacheRoot if cacheRoot else os.path.join(tempfile.gettempdir(), "mod3TextureCache")
+        self.maxBytes = maxBytes
+        self.workers = workers if workers else min(8, os.cpu_count() or 1)
+        
+    @staticmethod
+    def contentHash(path):
+        digest = hashlib.sha1()
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(1<<20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+        
+    def convert(self, path):
+        #Returns the png path without extension or None when conversion failed
+        stem, extension = os.path.splitext(path)
+        extension = extension.lower()
+        if extension == ".png":
+            return stem
+        entry = os.path.join(self.cacheRoot, self.contentHash(path))
+        name = os.path.basename(stem)
+        target = os.path.join(entry, name)
+        if os.path.exists(target+".png"):
+            os.utime(entry)
+            return target
+        os.makedirs(entry, exist_ok = True)
+        if extension == ".tex":
+            path = convertTexToDDS(path, target+".dds")
+            if path is None:
+                return None
+        return target if convertDDSToPNG(path, entry) else None
+        
+    def convertAll(self, paths):
+        """Converts every distinct source path, returns source path -> png path without extension."""
+        paths = list(dict.fromkeys(paths))
+        with ThreadPoolExecutor(max_workers = self.workers) as pool:
+            results = dict(zip(paths, pool.map(self.safeConvert, paths)))
+        self.evict()
+        return results
+    
+    def safeConvert(self, path):
+        try:
+            return self.convert(path)
+        except OSError:
+            return None
+        
+    def evict(self):
+        if not os.path.isdir(self.cacheRoot):
+            return
+        entries = []
+        for entry in os.scandir(self.cacheRoot):
+            if entry.is_dir():
+                size = sum(item.stat().st_size for item in os.scandir(entry.path) if item.is_file())
+                entries.append((entry.stat().st_mtime, size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            shutil.rmtree(path, ignore_errors = True)
+            total -= size
+
+textureCache = TextureCache()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 00:34:57 2026
+
+@author: AsteriskAmpersand
+"""
+import struct
+import numpy as np
+import pytest
+
+import DDSDecoder as DDS
+
+RED, BLUE = (255,0,0,255), (0,0,255,255)
+BC7_WEIGHTS4 = [0,4,9,13,17,21,26,30,34,38,43,47,51,55,60,64]
+BC7_WEIGHTS2 = [0,21,43,64]
+
+def packBits(fields):
+    #(value, bitCount) pairs packed least significant bit first into a 16 byte block
+    value, position = 0, 0
+    for field, count in fields:
+        value |= field << position
+        position += count
+    assert position == 128
+    return value.to_bytes(16, "little")
+
+def indexBits(indices, bitCount):
+    return sum(index << (bitCount*ix) for ix, index in enumerate(indices))
+
+def decode(textureFormat, block):
+    return DDS.decodeSurface(block, textureFormat, 4, 4).reshape(16,4).tolist()
+
+def lerp(e0, e1, weight):
+    return [((64-weight)*a + weight*b + 32) >> 6 for a, b in zip(e0, e1)]
+
+def test_bc1FourColourBlock():
+    block = struct.pack("<HHI", 0xF800, 0x001F, 0xE4E4E4E4)
+    assert decode("BC1", block) == [list(RED), list(BLUE), [170,0,85,255], [85,0,170,255]]*4
+
+def test_bc1PunchThroughBlock():
+    block = struct.pack("<HHI", 0x001F, 0xF800, 0xE4E4E4E4)
+    assert decode("BC1", block) == [list(BLUE), list(RED), [127,0,127,255], [0,0,0,0]]*4
+
+def test_bc2ExplicitAlpha():
+    block = struct.pack("<QHHI", 0xFEDCBA9876543210, 0x001F, 0xF800, 0xE4E4E4E4)
+    colours = [[0,0,255], [255,0,0], [85,0,170], [170,0,85]]*4
+    assert decode("BC2", block) == [colour + [17*ix] for ix, colour in enumerate(colours)]
+
+def test_bc3InterpolatedAlpha():
+    alphaIndices = indexBits([ix%8 for ix in range(16)], 3).to_bytes(6, "little")
+    block = bytes([255,0]) + alphaIndices + struct.pack("<HHI", 0xF800, 0x001F, 0)
+    alphas = [255,0,218,182,145,109,72,36]
+    assert decode("BC3", block) == [[255,0,0,alphas[ix%8]] for ix in range(16)]
+
+def test_bc4SixValueBlock():
+    block = bytes([0,255]) + indexBits([ix%8 for ix in range(16)], 3).to_bytes(6, "little")
+    values = [0,255,51,102,153,204,0,255]
+    assert decode("BC4", block) == [[values[ix%8]]*3 + [255] for ix in range(16)]
+
+def test_bc5TwoChannels():
+    red = bytes([255,0]) + indexBits([ix%8 for ix in range(16)], 3).to_bytes(6, "little")
+    green = bytes([0,255]) + indexBits([1]*16, 3).to_bytes(6, "little")
+    reds = [255,0,218,182,145,109,72,36]
+    assert decode("BC5", red + green) == [[reds[ix%8],255,0,255] for ix in range(16)]
+
+def test_bc7Mode6():
+    #One subset, 7 bit RGBA endpoints with a unique p-bit each, 4 bit indices
+    block = packBits([(1<<6,7), (0,7), (127,7), (64,7), (64,7), (127,7), (0,7), (127,7), (127,7),
+                      (1,1), (1,1), (0,3)] + [(ix,4) for ix in range(1,16)])
+    e0, e1 = [1,129,255,255], [255,129,1,255]
+    assert decode("BC7", block) == [lerp(e0, e1, BC7_WEIGHTS4[ix]) for ix in range(16)]
+
+def test_bc7Mode5WithRotation():
+    #One subset, 7 bit colour and 8 bit alpha endpoints, separate 2 bit colour and alpha indices,
+    #rotation 1 swaps red and alpha after interpolation
+    colourIndices = [ix%4 for ix in range(16)]
+    alphaIndices = [(3-ix)%4 if ix else 0 for ix in range(16)]
+    block = packBits([(1<<5,6), (1,2), (0,7), (127,7), (32,7), (32,7), (127,7), (0,7), (10,8), (250,8),
+                      (colourIndices[0],1)] + [(index,2) for index in colourIndices[1:]] +
+                     [(alphaIndices[0],1)] + [(index,2) for index in alphaIndices[1:]])
+    unquantize = lambda value: value << 1 | value >> 6
+    e0 = [unquantize(0), unquantize(32), unquantize(127), 10]
+    e1 = [unquantize(127), unquantize(32), unquantize(0), 250]
+    expected = []
+    for colourIndex, alphaIndex in zip(colourIndices, alphaIndices):
+        texel = lerp(e0[:3], e1[:3], BC7_WEIGHTS2[colourIndex]) + lerp(e0[3:], e1[3:], BC7_WEIGHTS2[alphaIndex])
+        texel[0], texel[3] = texel[3], texel[0]
+        expected.append(texel)
+    assert decode("BC7", block) == expected
+
+def test_bc7ReservedModeIsTransparentBlack():
+    assert decode("BC7", bytes(16)) == [[0,0,0,0]]*16
+
+def test_blocksTileRowMajor():
+    #Two blocks wide, the second block is solid blue and lands on the right half
+    blocks = struct.pack("<HHI", 0xF800, 0xF800, 0) + struct.pack("<HHI", 0x001F, 0x001F, 0)
+    pixels = DDS.decodeSurface(blocks, "BC1", 8, 4)
+    assert pixels.shape == (4,8,4)
+    assert (pixels[:,:4] == RED).all() and (pixels[:,4:] == BLUE).all()
+
+@pytest.mark.parametrize("textureFormat", ["BC1", "BC3", "BC7"])
+def test_ddsHeaderRoundTrips(textureFormat):
+    surface = bytes(DDS.surfaceSize(textureFormat, 8, 8) + DDS.surfaceSize(textureFormat, 4, 4))
+    texture = DDS.DDSTexture(DDS.ddsHeader(textureFormat, 8, 8, 2, srgb = True) + surface)
+    assert (texture.format, texture.width, texture.height, texture.mipCount, texture.srgb) == (textureFormat, 8, 8, 2, True)
+    assert texture.mipOffsets == [148, 148 + DDS.surfaceSize(textureFormat, 8, 8)]
+    assert texture.decode(1).shape == (4,4,4)
+
+def test_bc6hIsNotDecodable():
+    assert not DDS.canDecode("BC6H")
+    with pytest.raises(ValueError):
+        DDS.decodeSurface(bytes(16), "BC6H", 4, 4)
@@ -197,6 +197,7 @@ def armature_to_emptys():
     
     bpy.ops.object.mode_set(mode='OBJECT')  
     
+    boneNameSet = set(bones_name)
     for n in bones_name:
         c = bpy.data.armatures[ArmatureName].bones[n]  
         #print(c["boneFunction"])
@@ -217,7 +218,7 @@ def armature_to_emptys():
                 constraint_name = bpy.context.object.constraints[0].name
                 bpy.ops.constraint.delete(constraint=constraint_name, owner='OBJECT')
             else:
-                if "bonefunction_%03d"%(c["child"]) not in bones_name:
+                if "bonefunction_%03d"%(c["child"]) not in boneNameSet:
                     constraint_name = bpy.context.object.constraints[0].name
                     bpy.ops.constraint.delete(constraint=constraint_name, owner='OBJECT')
                 else:
@@ -4,6 +4,7 @@ Created on Wed Mar  6 14:09:29 2019
 
 @author: AsteriskAmpersand
 """
+import re
 import bpy
 from bpy_extras.io_utils import ImportHelper
 from bpy.props import StringProperty, BoolProperty, EnumProperty
@@ -20,6 +21,7 @@ class Context():
         self.path = path
         self.meshes = meshes
         self.armature = armature
+        self.boneFunctions = None
         self.setDefaults = False
 
 class ImportMOD3(Operator, ImportHelper):
@@ -97,42 +99,42 @@ class ImportMOD3(Operator, ImportHelper):
         except:
             pass
         bpy.ops.object.select_all(action='DESELECT')
-        Mod3File = FL.FileLike(open(self.properties.filepath,'rb').read())
         BApi = Api.BlenderImporterAPI()
         options = self.parseOptions()
         #print(options["Split Weights"])
         blenderContext = Context(self.properties.filepath,None,None)
-        with BlenderSupressor.SupressBlenderOps():
-            Mod3IL.Mod3ToModel(Mod3File, BApi, options).execute(blenderContext)   
+        with FL.MappedFileLike.fromPath(self.properties.filepath) as Mod3File:
+            with BlenderSupressor.SupressBlenderOps():
+                Mod3IL.Mod3ToModel(Mod3File, BApi, options).execute(blenderContext)   
    
         Armature_Name = bpy.context.active_object.data.name
         obj = bpy.context.active_object.data.bones 
+        #Imported bones are named Bone.%03d after their index and carry their function as a custom
+        #property, bones without one (the Bone.255 root) become bonefunction_255
+        boneName = re.compile(r"Bone\.(\d{3})$")
+        functions = blenderContext.boneFunctions
+        if functions is None:
+            #No skeleton was read by this import, index the bones' own properties instead
+            boneFunctions = {}
+            for bone in obj:
+                match = boneName.match(bone.name)
+                if match and "boneFunction" in bone.keys():
+                    boneFunctions[int(match.group(1))] = bone["boneFunction"]
+            boneFunction = lambda boneIx: boneFunctions.get(boneIx, 255)
+        else:
+            boneFunction = lambda boneIx: functions.function(boneIx, 255)
 
-        name_func = [["",""]]*len(obj)
-
-        for i in range(len(obj)):
-            if "boneFunction" not in obj[i].keys():
-                name_func[i] = [obj[i].name, "255"]
-            else:
-                #name_func[i] = [obj[i].name,str(obj[i]["boneFunction"])]
-                name_func[i] = [obj[i].name,"%03d"%obj[i]["boneFunction"]]
-        #print(name_func)
-
-        for i in range(len(obj)):
-            name_in = name_func[i][0]
-            name_out = name_func[i][1]
-    
-            if "boneFunction" not in obj[i].keys():
-                obj[i].name = "bonefunction_%03d"%int(name_out)
-            else:
-                bpy.data.armatures[Armature_Name].bones.active = bpy.data.armatures[Armature_Name].bones[name_in]   
+        for bone in list(obj):
+            if "boneFunction" in bone.keys():
+                function = bone["boneFunction"]
+                bpy.data.armatures[Armature_Name].bones.active = bone
                 bpy.ops.wm.properties_remove(data_path="active_bone", property_name="boneFunction")  
-                child_id = bpy.data.armatures[Armature_Name].bones[name_in]["child"]
-                child_id = "Bone.%03d"%child_id
-                for j in range(len(obj)):
-                    if name_func[j][0] == child_id:
-                        bpy.data.armatures[Armature_Name].bones[name_in]["child"] = int(name_func[j][1])               
-                obj[i].name = "bonefunction_%03d"%int(name_out)
+                bone["child"] = boneFunction(bone["child"])
+            elif boneName.match(bone.name):
+                function = 255
+            else:
+                continue
+            bone.name = "bonefunction_%03d"%function
         if options["Split Weights"] == "Group":
             for k in bpy.context.selected_objects:
                 if k.type == "MESH":
@@ -140,23 +142,11 @@ class ImportMOD3(Operator, ImportHelper):
                     k.modifiers[0].object = bpy.context.active_object
         else: 
             bpy.ops.object.parent_set(type='OBJECT', keep_transform=True)
-            for i in range(len(obj)):
-                name_func[i][0] = name_func[i][0].replace("Bone.","")
-            #print(name_func)    
+            boneGroup = re.compile(r"Bone\.(\(?)(\d{3})")
+            renameGroup = lambda match: "bonefunction_%s%03d"%(match.group(1), boneFunction(int(match.group(2))))
             for obj in bpy.context.selected_objects:
-                v_groups = obj.vertex_groups
-                #for i in range(len(v_groups)):
-                    #v_groups[i].name = v_groups[i].name.replace("Bone.","bonefunction_")
-                for i in range(len(v_groups)):
-                    for n in name_func:
-                        if n[0] in v_groups[i].name:
-                            v_groups[i].name = v_groups[i].name.replace("Bone.","bonefunction_")
-                            v_groups[i].name = v_groups[i].name.replace(n[0],n[1])
-                            break 
-                        else:
-                            continue
-                for i in range(len(v_groups)):
-                    v_groups[i].name = v_groups[i].name.replace(".001","")
+                for group in obj.vertex_groups:
+                    group.name = boneGroup.sub(renameGroup, group.name, count = 1).replace(".001","")
             #bpy.ops.object.select_pattern(pattern=Armature_Name, case_sensitive=False, extend=True)      
         
         bpy.context.active_object.scale = (0.010,0.010,0.010)